@@ -8,18 +8,550 @@ import os
 # Add core to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'core'))
 
-from flask import Flask, render_template, request, jsonify
-import numpy as np
-import librosa
-import io
+# Persist numba's compiled kernels across restarts (must be set before
+# librosa/numba are imported)
+if os.getenv('NUMBA_CACHE_DIR'):
+    os.makedirs(os.environ['NUMBA_CACHE_DIR'], exist_ok=True)
+
+from flask import Flask, Response, render_template, request, jsonify, g
+from werkzeug.exceptions import RequestEntityTooLarge
 import base64
-from core import VoiceAnalyzer, CharacterMatcher
+import binascii
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from core import (
+    VoiceAnalyzer, CharacterMatcher, AudioDecoder, InvalidAudioError, get_analysis_profile,
+    AnalysisPool, PoolSaturatedError, warm_up, FeatureCache,
+    ImageProxy, ImageFetchError, CharacterCatalog,
+    StreamSessionManager, StreamCapacityError,
+    MetricsRegistry, stage_timer, RequestProfiler
+)
 
 app = Flask(__name__)
 
+# Upload limits: bodies over MAX_UPLOAD_BYTES are rejected with 413 before
+# being read, and at most MAX_AUDIO_SECONDS of audio is ever decoded
+MAX_UPLOAD_BYTES = int(os.getenv('MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+MAX_AUDIO_SECONDS = float(os.getenv('MAX_AUDIO_SECONDS', '30'))
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES or None
+
+# Prometheus metrics, exported on /metrics (per process: with several
+# gunicorn workers, each scrape sees the worker that answered it, and the
+# pid label keeps every worker's series distinct)
+metrics = MetricsRegistry(process_label='pid')
+REQUESTS = metrics.counter(
+    'voice_http_requests_total', 'HTTP requests handled.', ('endpoint', 'method', 'status')
+)
+REQUEST_ERRORS = metrics.counter(
+    'voice_http_request_errors_total', 'Requests answered with a 4xx/5xx status.',
+    ('endpoint', 'kind')
+)
+REQUEST_SECONDS = metrics.histogram(
+    'voice_http_request_duration_seconds', 'Wall time per request.', ('endpoint',)
+)
+REQUESTS_IN_FLIGHT = metrics.gauge(
+    'voice_http_requests_in_flight', 'Requests currently being handled.'
+)
+ANALYSES_IN_FLIGHT = metrics.gauge(
+    'voice_analyses_in_flight', 'Recordings currently being decoded or analyzed.'
+)
+STAGE_SECONDS = metrics.histogram(
+    'voice_analysis_stage_seconds',
+    'Time per pipeline stage (body read, decode, feature stages, matching).',
+    ('stage',)
+)
+AUDIO_PROCESSED_SECONDS = metrics.counter(
+    'voice_audio_processed_seconds_total', 'Seconds of audio decoded and analyzed.'
+)
+AUDIO_DURATION = metrics.histogram(
+    'voice_audio_duration_seconds', 'Duration of each analyzed recording.',
+    buckets=(1, 2, 3, 5, 10, 15, 20, 30, 60, 120)
+)
+
+# Analysis profile ('quality' = 44.1 kHz, 'fast' = 16 kHz), chosen at startup
+profile = get_analysis_profile(
+    os.getenv('ANALYSIS_PROFILE', 'quality'),
+    sample_rate=os.getenv('ANALYSIS_SAMPLE_RATE')
+)
+
+# External character catalog (built-in profiles when unset); polled for
+# changes every CATALOG_RELOAD_INTERVAL seconds and hot-swapped
+CATALOG_PATH = os.getenv('CHARACTER_CATALOG') or None
+CATALOG_RELOAD_INTERVAL = float(os.getenv('CATALOG_RELOAD_INTERVAL', '5'))
+
 # Initialize components
-analyzer = VoiceAnalyzer()
-matcher = CharacterMatcher()
+analyzer = VoiceAnalyzer(
+    sample_rate=profile['sample_rate'],
+    n_fft=profile['n_fft'],
+    hop_length=profile['hop_length'],
+    pitch_backend=os.getenv('PITCH_BACKEND', 'piptrack'),
+    tempo_method=os.getenv('TEMPO_METHOD', 'speaking_rate'),
+    vad=os.getenv('VOICE_ACTIVITY_DETECTION', 'false').lower() == 'true'
+)
+matcher = CharacterMatcher(
+    catalog_path=CATALOG_PATH,
+    match_mode=os.getenv('MATCH_MODE', 'profile')
+)
+catalog = CharacterCatalog(matcher.db)
+decoder = AudioDecoder(
+    sample_rate=profile['sample_rate'],
+    fast_resample=profile['fast_resample'],
+    max_duration=MAX_AUDIO_SECONDS or None
+)
+
+# Encoded uploads at least this large are decoded and analyzed block by
+# block with constant memory instead of being decoded in full (0 disables)
+BLOCKWISE_MIN_BYTES = int(os.getenv('BLOCKWISE_MIN_BYTES', str(2 * 1024 * 1024)))
+
+# Feature extraction runs in a bounded pool off the request thread
+# (ANALYSIS_WORKERS=0 keeps it inline)
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '0'))
+ANALYSIS_QUEUE_SIZE = os.getenv('ANALYSIS_QUEUE_SIZE')
+ANALYSIS_RETRY_AFTER = int(os.getenv('ANALYSIS_RETRY_AFTER', '1'))
+analysis_pool = AnalysisPool(
+    analyzer,
+    workers=ANALYSIS_WORKERS,
+    max_pending=int(ANALYSIS_QUEUE_SIZE) if ANALYSIS_QUEUE_SIZE else None
+)
+
+# Content-addressed cache of analysis results (FEATURE_CACHE_ENTRIES=0 disables)
+feature_cache = FeatureCache(
+    max_entries=int(os.getenv('FEATURE_CACHE_ENTRIES', '1024')),
+    max_bytes=int(os.getenv('FEATURE_CACHE_BYTES', str(16 * 1024 * 1024))),
+    ttl=int(os.getenv('FEATURE_CACHE_TTL', '3600')),
+    disk_dir=os.getenv('FEATURE_CACHE_DIR') or None,
+    disk_max_entries=int(os.getenv('FEATURE_CACHE_DISK_ENTRIES', '16384')),
+    disk_max_bytes=int(os.getenv('FEATURE_CACHE_DISK_BYTES', str(256 * 1024 * 1024))),
+    # Everything that changes the result for the same bytes, including how
+    # much of the upload is decoded and how it is resampled
+    namespace=(
+        f"{analyzer.sample_rate}:{analyzer.n_fft}:{analyzer.hop_length}:"
+        f"{analyzer.pitch_estimator.name}:{analyzer.tempo_method}:"
+        f"{'vad' if analyzer.vad else 'full'}:"
+        f"{decoder.max_duration}:{'fast' if decoder.fast_resample else 'hq'}"
+    )
+)
+
+# Character image proxy (single-flight upstream fetches, in-memory hot cache)
+IMAGE_CACHE_MAX_AGE = int(os.getenv('IMAGE_CACHE_MAX_AGE', '86400'))
+image_proxy = ImageProxy(
+    os.path.join(os.path.dirname(__file__), 'static', 'character_images'),
+    timeout=float(os.getenv('IMAGE_FETCH_TIMEOUT', '5')),
+    max_concurrent_fetches=int(os.getenv('IMAGE_FETCH_CONCURRENCY', '4')),
+    max_memory_bytes=int(os.getenv('IMAGE_MEMORY_CACHE_BYTES', str(8 * 1024 * 1024)))
+)
+
+# Chunked streaming uploads, decoded and analyzed while the user records.
+# Sessions live in this process, so chunks must reach the same worker.
+stream_sessions = StreamSessionManager(
+    analyzer,
+    decoder,
+    max_sessions=int(os.getenv('STREAM_MAX_SESSIONS', '32')),
+    idle_timeout=float(os.getenv('STREAM_IDLE_TIMEOUT', '60'))
+)
+
+# Batch analysis settings
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '16'))
+batch_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('BATCH_WORKERS', str(min(4, os.cpu_count() or 1)))),
+    thread_name_prefix='batch-analyze'
+)
+
+
+_catalog_reload_lock = threading.Lock()
+_catalog_state = {
+    'checked_at': time.monotonic(),
+    'mtime': os.stat(CATALOG_PATH).st_mtime_ns if CATALOG_PATH else None
+}
+
+
+def reload_catalog():
+    """
+    Load the external catalog again and swap in new matcher tables and
+    precomputed catalog payloads.
+    """
+    global catalog
+    db = matcher.reload(CATALOG_PATH)
+    catalog = CharacterCatalog(db)
+    print(f"✅ Loaded character catalog version {db.version} ({len(db.characters)} characters)")
+
+
+@app.before_request
+def _start_request_metrics():
+    """Count the request as in flight and start its timer."""
+    g.request_started = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc()
+
+
+@app.after_request
+def _count_response(response):
+    """Count the response by endpoint and status."""
+    endpoint = request.endpoint or 'unmatched'
+    REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    if response.status_code >= 400:
+        kind = 'server' if response.status_code >= 500 else 'client'
+        REQUEST_ERRORS.inc(endpoint=endpoint, kind=kind)
+    return response
+
+
+@app.teardown_request
+def _finish_request_metrics(error=None):
+    """Record the request duration (runs even when the handler raised)."""
+    started = g.pop('request_started', None)
+    if started is None:
+        return
+    REQUESTS_IN_FLIGHT.dec()
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - started, endpoint=request.endpoint or 'unmatched'
+    )
+
+
+# Opt-in request profiling: set PROFILE_DIR, then send 'X-Profile: 1' or set
+# PROFILE_SAMPLE_RATE to capture /api/analyze requests under cProfile
+PROFILE_DIR = os.getenv('PROFILE_DIR') or None
+request_profiler = None
+if PROFILE_DIR:
+    request_profiler = RequestProfiler(
+        PROFILE_DIR,
+        sample_rate=float(os.getenv('PROFILE_SAMPLE_RATE', '0')),
+        header=os.getenv('PROFILE_HEADER', 'X-Profile'),
+        max_files=int(os.getenv('PROFILE_MAX_FILES', '50'))
+    )
+
+
+def _record_stage_timings(stage_timings):
+    """Feed one request's stage timings into the stage histogram."""
+    for stage, seconds in stage_timings.items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+def _record_audio_processed(features):
+    """Account for a freshly analyzed recording."""
+    AUDIO_PROCESSED_SECONDS.inc(features['duration'])
+    AUDIO_DURATION.observe(features['duration'])
+
+
+@app.before_request
+def _reload_catalog_if_changed():
+    """Hot-reload the external catalog when its file has been replaced."""
+    if not CATALOG_PATH:
+        return
+    now = time.monotonic()
+    if now - _catalog_state['checked_at'] < CATALOG_RELOAD_INTERVAL:
+        return
+    # Only one request thread checks; the others keep serving the current catalog
+    if not _catalog_reload_lock.acquire(blocking=False):
+        return
+    try:
+        _catalog_state['checked_at'] = now
+        mtime = os.stat(CATALOG_PATH).st_mtime_ns
+        if mtime != _catalog_state['mtime']:
+            reload_catalog()
+            _catalog_state['mtime'] = mtime
+    except Exception:
+        import traceback
+        traceback.print_exc()
+        print("⚠️  Catalog reload failed; keeping the current version")
+    finally:
+        _catalog_reload_lock.release()
+
+
+# Readiness: set once the startup warm-up has exercised the whole pipeline
+WARMUP_ENABLED = os.getenv('WARMUP', 'true').lower() == 'true'
+ready = threading.Event()
+
+
+def run_warmup():
+    """
+    Warm up the analysis pipeline and mark this process ready.
+    
+    Runs the full decode/extract/categorize/match path on synthetic audio so
+    numba JIT compilation and ffmpeg discovery do not land on the first user
+    request. Call before serving (or before forking workers).
+    """
+    if not WARMUP_ENABLED:
+        ready.set()
+        return
+    
+    try:
+        timings = warm_up(analyzer, matcher, decoder)
+        print(f"✅ Warm-up complete in {timings['total']:.2f}s")
+        ready.set()
+    except Exception:
+        import traceback
+        traceback.print_exc()
+        print("⚠️  Warm-up failed; /api/ready will keep reporting not ready")
+
+
+def _decode_base64_audio(audio_base64):
+    """Decode a base64 string or data URL ("data:audio/webm;base64,...") to bytes."""
+    if not isinstance(audio_base64, str):
+        raise InvalidAudioError("Audio must be a base64 string or data URL")
+    if ',' in audio_base64:
+        audio_base64 = audio_base64.split(',', 1)[1]
+    try:
+        return base64.b64decode(audio_base64)
+    except binascii.Error:
+        raise InvalidAudioError("Audio is not valid base64")
+
+
+def _read_pcm_format():
+    """
+    Detect a raw PCM upload from the request's content type.
+    
+    Returns:
+        Tuple of (sample_format, sample_rate), or None for container uploads
+    """
+    return _parse_pcm_format(request.mimetype, request.mimetype_params)
+
+
+def _parse_pcm_format(mimetype, params):
+    """
+    Parse the sample format of a raw PCM upload.
+    
+    Raw PCM is sent as "audio/pcm;format=f32le;rate=44100" (format is
+    f32le or s16le, little-endian mono; rate defaults to the analysis rate).
+    
+    Args:
+        mimetype: Content type without parameters
+        params: Content type parameters
+    
+    Returns:
+        Tuple of (sample_format, sample_rate), or None for container uploads
+    """
+    if mimetype != 'audio/pcm':
+        return None
+    try:
+        rate = int(params['rate']) if 'rate' in params else None
+    except ValueError:
+        raise ValueError(f"Invalid PCM sample rate '{params['rate']}'")
+    if rate is not None and rate <= 0:
+        raise ValueError("PCM sample rate must be positive")
+    return params.get('format', 'f32le'), rate
+
+
+def _read_audio_bytes(stage_timings=None):
+    """
+    Read the uploaded audio blob from the current request.
+    
+    Supports four upload modes:
+    - raw PCM (audio/pcm;format=...;rate=...), analyzed without ffmpeg
+    - multipart/form-data with an 'audio' file field
+    - a raw binary body (application/octet-stream, audio/webm, audio/ogg, ...)
+    - JSON with a base64 data URL in 'audio' (legacy fallback)
+    
+    Args:
+        stage_timings: Optional dict receiving 'base64_decode' seconds
+    
+    Returns:
+        Encoded audio bytes, or None if no audio was provided
+    
+    Raises:
+        InvalidAudioError: If a JSON body is not an object
+    """
+    content_type = request.mimetype or ''
+    
+    if content_type == 'multipart/form-data':
+        upload = request.files.get('audio')
+        return upload.read() if upload else None
+    
+    if content_type == 'application/octet-stream' or content_type.startswith('audio/'):
+        return request.get_data(cache=False)
+    
+    data = request.get_json(silent=True)
+    if data is None:
+        return None
+    if not isinstance(data, dict):
+        raise InvalidAudioError('Request body must be a JSON object with an "audio" data URL')
+    audio_base64 = data.get('audio')
+    if not audio_base64:
+        return None
+    
+    with stage_timer(stage_timings, 'base64_decode'):
+        return _decode_base64_audio(audio_base64)
+
+
+def _use_blockwise_extraction(audio_bytes, pcm_format):
+    """
+    Whether an upload should be decoded and analyzed block by block.
+    
+    Block-wise extraction always estimates tempo from the speaking rate and
+    cannot trim silence (the VAD needs the whole clip), so it is only used
+    when the analyzer is configured the same way.
+    """
+    return (
+        BLOCKWISE_MIN_BYTES > 0
+        and len(audio_bytes) >= BLOCKWISE_MIN_BYTES
+        and not pcm_format
+        and analyzer.tempo_method == 'speaking_rate'
+        and analyzer.vad is None
+    )
+
+
+def _analyze_audio_bytes(audio_bytes, pcm_format=None, stage_timings=None, profiling=False):
+    """
+    Run the full pipeline on one recording.
+    
+    Args:
+        audio_bytes: Encoded audio file contents, or raw PCM samples
+        pcm_format: (sample_format, sample_rate) for raw PCM, None for
+            container formats that need ffmpeg
+        stage_timings: Dict receiving per-stage seconds (default: a new
+            one); the stages are recorded in the stage histogram
+        profiling: Skip the feature cache and analyze on this thread, so a
+            profiler wrapping the request sees the full pipeline
+    
+    Returns:
+        Response dict with 'voice_analysis' and 'matches'
+    """
+    if stage_timings is None:
+        stage_timings = {}
+    
+    try:
+        # Identical uploads (retries, double-clicks, replays) reuse earlier results
+        with stage_timer(stage_timings, 'cache_lookup'):
+            variant = 'pcm:{}:{}'.format(*pcm_format) if pcm_format else ''
+            cache_key = feature_cache.key_for(audio_bytes, variant)
+            cached = None if profiling else feature_cache.get(cache_key)
+        
+        if cached is not None:
+            features, characteristics = cached
+        else:
+            with ANALYSES_IN_FLIGHT.track_inprogress():
+                if _use_blockwise_extraction(audio_bytes, pcm_format):
+                    # Long upload: decode and analyze block by block so
+                    # memory stays flat regardless of duration
+                    features, characteristics = analysis_pool.analyze_encoded(
+                        audio_bytes, decoder, stage_timings, inline=profiling
+                    )
+                else:
+                    if pcm_format:
+                        # Raw PCM: wrap the samples directly, no container decoding
+                        with stage_timer(stage_timings, 'pcm_decode'):
+                            audio_data, sr = decoder.decode_pcm(audio_bytes, *pcm_format)
+                    else:
+                        # Decode straight from memory through an ffmpeg pipe
+                        with stage_timer(stage_timings, 'decode'):
+                            audio_data, sr = decoder.decode(audio_bytes)
+                    
+                    # Analyze voice (in the analysis pool; raises PoolSaturatedError when full)
+                    features, characteristics = analysis_pool.analyze(
+                        audio_data, stage_timings, inline=profiling
+                    )
+            feature_cache.put(cache_key, (features, characteristics))
+            _record_audio_processed(features)
+        
+        # Match to characters
+        with stage_timer(stage_timings, 'match'):
+            matches = matcher.get_top_matches(features, characteristics, top_n=5)
+        
+        return _build_analysis_response(features, characteristics, matches)
+    finally:
+        # Also recorded for failed requests, which are often the slow ones
+        _record_stage_timings(stage_timings)
+
+
+def _build_analysis_response(features, characteristics, matches):
+    """Build the JSON-serializable /api/analyze response body."""
+    return {
+        'success': True,
+        'voice_analysis': {
+            'pitch': float(features['mean_pitch']),
+            'pitch_description': characteristics['pitch_description'],
+            'energy': float(features['mean_energy']),
+            'energy_description': characteristics['energy_description'],
+            'tempo': float(features['tempo']),
+            'tempo_description': characteristics['tempo_description'],
+            'spectral_centroid': float(features['spectral_centroid']),
+            'duration': float(features['duration']),
+            'speech_duration': float(features['speech_duration'])
+        },
+        'matches': [
+            {
+                'character': m['character'],
+                'game': m['game'],
+                'emoji': m['emoji'],
+                'description': m['description'],
+                'personality': m['personality'],
+                'score': float(m['score']),
+                'image_url': m['image_url'],
+                'breakdown': {
+                    'pitch_match': float(m['breakdown']['pitch_match']),
+                    'energy_match': float(m['breakdown']['energy_match']),
+                    'tempo_match': float(m['breakdown']['tempo_match'])
+                }
+            }
+            for m in matches
+        ]
+    }
+
+
+def _read_batch_audio_items():
+    """
+    Read every recording of a batch upload.
+    
+    Supports multipart/form-data with repeated 'audio' file fields, or JSON
+    of the form {"recordings": ["data:audio/webm;base64,...", ...]}.
+    
+    Returns:
+        List of encoded audio bytes (None for items that could not be read)
+    
+    Raises:
+        InvalidAudioError: If the JSON body is not of that form
+    """
+    if request.mimetype == 'multipart/form-data':
+        return [upload.read() for upload in request.files.getlist('audio')]
+    
+    data = request.get_json(silent=True)
+    if data is None:
+        return []
+    if not isinstance(data, dict):
+        raise InvalidAudioError('Request body must be a JSON object with a "recordings" list')
+    recordings = data.get('recordings') or []
+    if not isinstance(recordings, list):
+        raise InvalidAudioError('"recordings" must be a list of base64 data URLs')
+    
+    items = []
+    for audio_base64 in recordings:
+        try:
+            items.append(_decode_base64_audio(audio_base64) if audio_base64 else None)
+        except (TypeError, ValueError):
+            items.append(None)
+    return items
+
+
+def _server_busy_response():
+    """Fast 503 telling the client when to retry."""
+    response = jsonify({'error': 'Server is busy, please retry shortly'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(ANALYSIS_RETRY_AFTER)
+    return response
+
+
+def _upload_too_large_response():
+    """413 naming the configured upload limit."""
+    return jsonify({
+        'error': f'Upload too large (limit is {MAX_UPLOAD_BYTES} bytes)'
+    }), 413
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def _handle_upload_too_large(error):
+    """Reject oversize bodies (Content-Length above MAX_UPLOAD_BYTES) as JSON."""
+    return _upload_too_large_response()
+
+
+def _analyze_batch_item(audio_bytes):
+    """Analyze one batch item, turning failures into a per-item error."""
+    if not audio_bytes:
+        return {'success': False, 'error': 'No audio data provided'}
+    try:
+        return _analyze_audio_bytes(audio_bytes)
+    except PoolSaturatedError:
+        return {'success': False, 'error': 'Server is busy, please retry shortly'}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
 
 
 @app.route('/')
@@ -28,102 +560,296 @@ def index():
     return render_template('index.html')
 
 
+@app.route('/api/health')
+def health():
+    """Liveness probe: the process is up and serving requests."""
+    return jsonify({'status': 'ok'})
+
+
+@app.route('/api/ready')
+def readiness():
+    """Readiness probe: only 200 once the startup warm-up has finished."""
+    if not ready.is_set():
+        return jsonify({'ready': False}), 503
+    return jsonify({'ready': True})
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus text exposition of request, stage and audio metrics."""
+    return Response(metrics.render(), content_type=MetricsRegistry.CONTENT_TYPE)
+
+
+@app.route('/api/cache/stats')
+def cache_stats():
+    """Feature cache hit/miss counters and occupancy."""
+    return jsonify(feature_cache.snapshot())
+
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_voice():
     """
     API endpoint to analyze voice recording.
-    Expects audio data as base64-encoded audio file.
+    Accepts raw PCM (audio/pcm), the raw audio blob (multipart or binary
+    body) or, as a fallback, a JSON body with a base64-encoded data URL.
+    """
+    if request_profiler is not None and request_profiler.should_profile(request.headers):
+        return _profile_analyze_request()
+    return _analyze_voice_request()
+
+
+def _profile_analyze_request():
+    """Run one /api/analyze request under cProfile and save the capture."""
+    details = {}
+    started = time.perf_counter()
+    result, profile = request_profiler.profile(_analyze_voice_request, details)
+    response = app.make_response(result)
+    if profile is None:
+        return response
+    
+    capture_id = request_profiler.save(profile, {
+        'path': request.path,
+        'content_type': request.content_type,
+        'content_length': request.content_length,
+        'status': response.status_code,
+        'wall_seconds': time.perf_counter() - started,
+        'audio_duration': details.get('audio_duration'),
+        'speech_duration': details.get('speech_duration'),
+        'stage_seconds': details.get('stage_timings', {}),
+    })
+    response.headers['X-Profile-Id'] = capture_id
+    return response
+
+
+def _analyze_voice_request(profile_details=None):
+    """
+    Handle an /api/analyze request.
+    
+    Args:
+        profile_details: Dict filled with audio duration and stage timings
+            when the request is being profiled (None otherwise)
     """
+    profiling = profile_details is not None
     try:
-        # Get audio data from request
-        data = request.get_json()
-        audio_base64 = data.get('audio')
-        
-        if not audio_base64:
-            return jsonify({'error': 'No audio data provided'}), 400
-        
-        # Decode base64 audio
-        audio_bytes = base64.b64decode(audio_base64.split(',')[1])
-        
-        # Save to temporary file (librosa handles various formats better from file)
-        import tempfile
-        with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as temp_audio:
-            temp_audio.write(audio_bytes)
-            temp_path = temp_audio.name
-        
         try:
-            # Load audio using librosa (it will handle webm via ffmpeg)
-            audio_data, sr = librosa.load(temp_path, sr=44100, mono=True)
-        finally:
-            # Clean up temp file
-            import os
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+            pcm_format = _read_pcm_format()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Analyze voice
-        features = analyzer.extract_features(audio_data)
-        characteristics = analyzer.categorize_voice(features)
+        stage_timings = {}
+        if profiling:
+            profile_details['stage_timings'] = stage_timings
+        with stage_timer(stage_timings, 'read_body'):
+            if pcm_format:
+                audio_bytes = request.get_data(cache=False)
+            else:
+                audio_bytes = _read_audio_bytes(stage_timings)
         
-        # Match to characters
-        matches = matcher.get_top_matches(features, characteristics, top_n=5)
+        if not audio_bytes:
+            return jsonify({'error': 'No audio data provided'}), 400
         
-        # Prepare response
-        response = {
-            'success': True,
-            'voice_analysis': {
-                'pitch': float(features['mean_pitch']),
-                'pitch_description': characteristics['pitch_description'],
-                'energy': float(features['mean_energy']),
-                'energy_description': characteristics['energy_description'],
-                'tempo': float(features['tempo']),
-                'tempo_description': characteristics['tempo_description'],
-                'spectral_centroid': float(features['spectral_centroid'])
-            },
-            'matches': [
-                {
-                    'character': m['character'],
-                    'game': m['game'],
-                    'emoji': m['emoji'],
-                    'description': m['description'],
-                    'personality': m['personality'],
-                    'score': float(m['score']),
-                    'image_url': m['image_url'],
-                    'breakdown': {
-                        'pitch_match': float(m['breakdown']['pitch_match']),
-                        'energy_match': float(m['breakdown']['energy_match']),
-                        'tempo_match': float(m['breakdown']['tempo_match'])
-                    }
-                }
-                for m in matches
-            ]
-        }
+        result = _analyze_audio_bytes(audio_bytes, pcm_format, stage_timings, profiling)
+        if profiling:
+            profile_details['audio_duration'] = result['voice_analysis']['duration']
+            profile_details['speech_duration'] = result['voice_analysis']['speech_duration']
+        return jsonify(result)
+    
+    except InvalidAudioError as e:
+        # Malformed upload (bad PCM body, base64 or container): the client's fault
+        return jsonify({'error': str(e)}), 400
+    except PoolSaturatedError:
+        return _server_busy_response()
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/analyze_batch', methods=['POST'])
+def analyze_voice_batch():
+    """
+    API endpoint to analyze several recordings in one request.
+    Recordings are decoded and analyzed in parallel; each result uses the
+    same schema as /api/analyze, or carries its own error.
+    """
+    try:
+        items = _read_batch_audio_items()
         
-        return jsonify(response)
+        if not items:
+            return jsonify({'error': 'No audio data provided'}), 400
+        if len(items) > BATCH_MAX_ITEMS:
+            return jsonify({
+                'error': f'Too many recordings ({len(items)} > {BATCH_MAX_ITEMS})'
+            }), 413
         
+        results = list(batch_executor.map(_analyze_batch_item, items))
+        return jsonify({'success': True, 'results': results})
+    
+    except InvalidAudioError as e:
+        return jsonify({'error': str(e)}), 400
+    except RequestEntityTooLarge:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/stream', methods=['POST'])
+def start_stream():
+    """
+    Open a streaming upload session.
+    The client then POSTs MediaRecorder chunks to /api/stream/<id>/chunk as
+    they are produced and calls /api/stream/<id>/finish after the last one.
+    """
+    try:
+        session = stream_sessions.create()
+    except StreamCapacityError:
+        return _server_busy_response()
+    return jsonify({'success': True, 'session_id': session.id}), 201
+
+
+@app.route('/api/stream/<session_id>/chunk', methods=['POST'])
+def stream_chunk(session_id):
+    """Append the next encoded chunk (raw body) to a streaming session."""
+    session = stream_sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Unknown or expired stream session'}), 404
+    
+    chunk = request.get_data(cache=False)
+    if not chunk:
+        return jsonify({'error': 'No audio data provided'}), 400
+    if MAX_UPLOAD_BYTES and session.bytes_received + len(chunk) > MAX_UPLOAD_BYTES:
+        stream_sessions.pop(session_id)
+        session.abort()
+        return _upload_too_large_response()
+    
+    try:
+        session.add_chunk(chunk)
+    except ValueError as e:
+        stream_sessions.pop(session_id)
+        session.abort()
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'bytes_received': session.bytes_received,
+        'frames_analyzed': session.extractor.frames_processed
+    })
+
+
+@app.route('/api/stream/<session_id>/finish', methods=['POST'])
+def finish_stream(session_id):
+    """
+    Finish a streaming session: flush the decoder, aggregate the frame
+    features computed so far and return the usual /api/analyze response.
+    """
+    session = stream_sessions.pop(session_id)
+    if session is None:
+        return jsonify({'error': 'Unknown or expired stream session'}), 404
+    
+    stage_timings = {}
+    try:
+        # Most frames were analyzed while uploading; this is the drain + aggregate
+        with stage_timer(stage_timings, 'stream_finish'):
+            features = session.finish()
+        _record_audio_processed(features)
+        characteristics = analyzer.categorize_voice(features)
+        with stage_timer(stage_timings, 'match'):
+            matches = matcher.get_top_matches(features, characteristics, top_n=5)
+        return jsonify(_build_analysis_response(features, characteristics, matches))
+    except ValueError as e:
+        # Undecodable or silent stream (InvalidAudioError): the client's fault
+        session.abort()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        session.abort()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        _record_stage_timings(stage_timings)
+
+
+@app.route('/api/stream/<session_id>', methods=['DELETE'])
+def cancel_stream(session_id):
+    """Discard a streaming session."""
+    session = stream_sessions.pop(session_id)
+    if session is None:
+        return jsonify({'error': 'Unknown or expired stream session'}), 404
+    session.abort()
+    return jsonify({'success': True})
+
+
 @app.route('/api/characters')
 def get_characters():
-    """Get all character data for display."""
-    db = matcher.db
-    characters = db.get_all_characters()
+    """
+    Get character data for display.
+    Without query parameters the precomputed full catalog is returned; with
+    game/energy/tempo filters or offset/limit a filtered page is built from
+    the catalog's secondary indexes.
+    """
+    try:
+        query = _read_catalog_query(request.args)
+        if query is None:
+            response = Response(catalog.payload, mimetype='application/json')
+            response.set_etag(catalog.etag)
+            return response.make_conditional(request)
+        payload = catalog.query(*query)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return Response(payload, mimetype='application/json')
+
+
+def _read_catalog_query(args):
+    """
+    Parse the /api/characters filter and pagination parameters.
+    
+    Other parameters (e.g. a "_=123" cache buster) are ignored.
+    
+    Args:
+        args: Query parameter mapping
+    
+    Returns:
+        Tuple of (filters, offset, limit), or None when no filter or
+        pagination parameter is present
+    """
+    filters = {
+        key: value for key, value in args.items()
+        if key in CharacterCatalog.FILTERS
+    }
+    if not filters and 'offset' not in args and 'limit' not in args:
+        return None
+    offset = _read_int_arg(args, 'offset', 0)
+    limit = _read_int_arg(args, 'limit', None)
+    return filters, offset, limit
+
+
+def _read_int_arg(args, name, default):
+    """
+    Read an integer query parameter.
+    
+    Args:
+        args: Query parameter mapping
+        name: Parameter name
+        default: Value when the parameter is absent
     
-    char_list = [
-        {
-            'name': name,
-            'game': data['game'],
-            'emoji': data['emoji'],
-            'description': data['description'],
-            'image_url': data['image_url']
-        }
-        for name, data in characters.items()
-    ]
+    Returns:
+        The parameter as an int, or default
     
-    return jsonify({'characters': char_list})
+    Raises:
+        ValueError: With a client-facing message when the value is not an
+            integer (int()'s own message would echo "invalid literal ...")
+    """
+    if name not in args:
+        return default
+    try:
+        return int(args[name])
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
 
 
 @app.route('/api/image/<path:character_name>')
@@ -132,10 +858,6 @@ def get_character_image(character_name):
     Proxy endpoint to serve character images.
     Downloads image from external URL and serves it to avoid CORS issues.
     """
-    import urllib.request
-    import os
-    from flask import send_file
-    
     # Get character data
     db = matcher.db
     char_data = db.get_character(character_name)
@@ -143,25 +865,18 @@ def get_character_image(character_name):
     if not char_data or not char_data.get('image_url'):
         return jsonify({'error': 'Character not found or no image'}), 404
     
-    # Create cache directory
-    cache_dir = os.path.join(os.path.dirname(__file__), 'static', 'character_images')
-    os.makedirs(cache_dir, exist_ok=True)
-    
-    # Determine file extension from URL
-    image_url = char_data['image_url']
-    ext = '.webp' if '.webp' in image_url else '.png'
-    cache_file = os.path.join(cache_dir, f"{character_name.replace(' ', '_')}{ext}")
-    
-    # Download and cache if not exists
-    if not os.path.exists(cache_file):
-        try:
-            urllib.request.urlretrieve(image_url, cache_file)
-        except Exception as e:
-            print(f"Error downloading image for {character_name}: {e}")
-            return jsonify({'error': 'Image download failed'}), 500
+    try:
+        image = image_proxy.get(character_name, char_data['image_url'])
+    except ImageFetchError as e:
+        print(f"Error downloading image for {character_name}: {e}")
+        return jsonify({'error': 'Image download failed'}), 500
     
-    # Serve the cached image
-    return send_file(cache_file, mimetype=f'image/{ext[1:]}')
+    # Serve the cached image; browsers revalidate with If-None-Match -> 304
+    response = Response(image.data, mimetype=image.mimetype)
+    response.set_etag(image.etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = IMAGE_CACHE_MAX_AGE
+    return response.make_conditional(request)
 
 
 if __name__ == '__main__':
@@ -169,11 +884,15 @@ if __name__ == '__main__':
     print("=" * 60)
     print("✅ Server starting on http://localhost:5000")
     print("✅ Open your browser and visit: http://localhost:5000")
+    print("ℹ️  Development server; for production run: gunicorn -c gunicorn.conf.py wsgi:app")
     print("=" * 60 + "\n")
     
     # Get debug mode from environment variable (default: False for production)
     import os
     debug_mode = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     
+    analysis_pool.start()
+    run_warmup()
+    
     app.run(debug=debug_mode, host='0.0.0.0', port=5000)
 
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Asyncio Server for Voice Character Matcher
+
+Serves /api/analyze, /api/characters and /api/image/... (plus the health,
+readiness and metrics probes) from one aiohttp event loop, reusing the
+components configured in app.py. ffmpeg runs through asyncio subprocess
+pipes, image downloads don't block the loop and feature extraction runs in
+an executor, so one process keeps many uploads in flight.
+
+Usage:
+    python async_app.py
+    gunicorn async_app:create_app --worker-class aiohttp.GunicornWebWorker
+"""
+import os
+import json
+import time
+import asyncio
+import traceback
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+from werkzeug.http import parse_options_header
+
+import app as sync_app
+from core import (
+    AsyncImageProxy, MetricsRegistry, PoolSaturatedError, ImageFetchError, InvalidAudioError,
+    stage_timer
+)
+
+ASYNC_PORT = int(os.getenv('ASYNC_PORT', '5001'))
+
+# Uploads decoded or analyzed at once; more are rejected with 503 right away
+# instead of queueing without bound
+ASYNC_MAX_ANALYSES = int(os.getenv('ASYNC_MAX_ANALYSES', '64'))
+
+# Threads running feature extraction (and block-wise decoding) off the loop.
+# With ANALYSIS_WORKERS they only wait on the process pool, so by default
+# there are enough of them to keep its queue full.
+ASYNC_ANALYSIS_THREADS = int(os.getenv('ASYNC_ANALYSIS_THREADS', '0')) or max(
+    sync_app.analysis_pool.max_pending, os.cpu_count() or 1
+)
+analysis_executor = ThreadPoolExecutor(
+    max_workers=ASYNC_ANALYSIS_THREADS,
+    thread_name_prefix='async-analyze'
+)
+
+
+@web.middleware
+async def _request_metrics(request, handler):
+    """Record the same request metrics as the Flask app."""
+    endpoint = request.match_info.route.name or 'unmatched'
+    started = time.perf_counter()
+    status = 500
+    sync_app.REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        sync_app.REQUESTS_IN_FLIGHT.dec()
+        sync_app.REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+        sync_app.REQUESTS.inc(endpoint=endpoint, method=request.method, status=status)
+        if status >= 400:
+            kind = 'server' if status >= 500 else 'client'
+            sync_app.REQUEST_ERRORS.inc(endpoint=endpoint, kind=kind)
+
+
+def _error_response(message, status):
+    """JSON error body, matching the Flask app's errors."""
+    return web.json_response({'error': message}, status=status)
+
+
+def _server_busy_response():
+    """Fast 503 telling the client when to retry."""
+    response = _error_response('Server is busy, please retry shortly', 503)
+    response.headers['Retry-After'] = str(sync_app.ANALYSIS_RETRY_AFTER)
+    return response
+
+
+def _conditional_response(request, body, content_type, etag, headers=None):
+    """Answer with 304 when the client already has this ETag."""
+    if_none_match = request.if_none_match or ()
+    if any(tag.value in (etag, '*') for tag in if_none_match):
+        response = web.Response(status=304, headers=headers)
+    else:
+        response = web.Response(body=body, content_type=content_type, headers=headers)
+    response.etag = etag
+    return response
+
+
+def _read_pcm_format(request):
+    """Detect a raw PCM upload from the request's content type."""
+    mimetype, params = parse_options_header(request.headers.get('Content-Type', ''))
+    return sync_app._parse_pcm_format(mimetype, params)
+
+
+async def _read_audio_bytes(request, pcm_format, stage_timings):
+    """
+    Read the uploaded audio blob (same upload modes as the Flask app).
+    
+    Bodies over MAX_UPLOAD_BYTES raise web.HTTPRequestEntityTooLarge.
+    
+    Returns:
+        Encoded audio bytes (or raw PCM), or None if no audio was provided
+    """
+    content_type = request.content_type
+    
+    if pcm_format or content_type == 'application/octet-stream' or content_type.startswith('audio/'):
+        return await request.read()
+    
+    if content_type == 'multipart/form-data':
+        upload = (await request.post()).get('audio')
+        return upload.file.read() if isinstance(upload, web.FileField) else None
+    
+    try:
+        data = json.loads(await request.read() or b'{}')
+    except ValueError:
+        return None
+    audio_base64 = data.get('audio') if isinstance(data, dict) else None
+    if not audio_base64:
+        return None
+    
+    with stage_timer(stage_timings, 'base64_decode'):
+        return sync_app._decode_base64_audio(audio_base64)
+
+
+async def _extract(audio_bytes, pcm_format, stage_timings):
+    """Decode and analyze one recording without blocking the loop."""
+    loop = asyncio.get_running_loop()
+    run = partial(loop.run_in_executor, analysis_executor)
+    analysis_pool = sync_app.analysis_pool
+    decoder = sync_app.decoder
+    
+    if sync_app._use_blockwise_extraction(audio_bytes, pcm_format):
+        # Long upload: ffmpeg is fed block by block on the executor thread
+        return await run(partial(
+            analysis_pool.analyze_encoded, audio_bytes, decoder, stage_timings
+        ))
+    
+    if pcm_format:
+        # Resampling is CPU work too
+        with stage_timer(stage_timings, 'pcm_decode'):
+            audio_data, sr = await run(partial(decoder.decode_pcm, audio_bytes, *pcm_format))
+    else:
+        with stage_timer(stage_timings, 'decode'):
+            audio_data, sr = await decoder.decode_async(audio_bytes)
+    
+    return await run(partial(analysis_pool.analyze, audio_data, stage_timings))
+
+
+async def _analyze_audio_bytes(request, audio_bytes, pcm_format, stage_timings):
+    """
+    Run the full pipeline on one recording.
+    
+    Returns:
+        Response dict with 'voice_analysis' and 'matches'
+    """
+    try:
+        with stage_timer(stage_timings, 'cache_lookup'):
+            variant = 'pcm:{}:{}'.format(*pcm_format) if pcm_format else ''
+            cache_key = sync_app.feature_cache.key_for(audio_bytes, variant)
+            cached = sync_app.feature_cache.get(cache_key)
+        
+        if cached is not None:
+            features, characteristics = cached
+        else:
+            analysis_slots = request.app['analysis_slots']
+            if analysis_slots.locked():
+                raise PoolSaturatedError("Too many analyses in flight")
+            async with analysis_slots:
+                with sync_app.ANALYSES_IN_FLIGHT.track_inprogress():
+                    features, characteristics = await _extract(audio_bytes, pcm_format, stage_timings)
+            sync_app.feature_cache.put(cache_key, (features, characteristics))
+            sync_app._record_audio_processed(features)
+        
+        with stage_timer(stage_timings, 'match'):
+            matches = sync_app.matcher.get_top_matches(features, characteristics, top_n=5)
+        
+        return sync_app._build_analysis_response(features, characteristics, matches)
+    finally:
+        sync_app._record_stage_timings(stage_timings)
+
+
+async def analyze_voice(request):
+    """
+    API endpoint to analyze voice recording.
+    Accepts raw PCM (audio/pcm), the raw audio blob (multipart or binary
+    body) or, as a fallback, a JSON body with a base64-encoded data URL.
+    """
+    try:
+        try:
+            pcm_format = _read_pcm_format(request)
+        except ValueError as e:
+            return _error_response(str(e), 400)
+        
+        stage_timings = {}
+        with stage_timer(stage_timings, 'read_body'):
+            audio_bytes = await _read_audio_bytes(request, pcm_format, stage_timings)
+        
+        if not audio_bytes:
+            return _error_response('No audio data provided', 400)
+        
+        result = await _analyze_audio_bytes(request, audio_bytes, pcm_format, stage_timings)
+        return web.json_response(result)
+    
+    except web.HTTPRequestEntityTooLarge:
+        return _error_response(
+            f'Upload too large (limit is {sync_app.MAX_UPLOAD_BYTES} bytes)', 413
+        )
+    except InvalidAudioError as e:
+        return _error_response(str(e), 400)
+    except PoolSaturatedError:
+        return _server_busy_response()
+    except Exception as e:
+        traceback.print_exc()
+        return _error_response(str(e), 500)
+
+
+async def get_characters(request):
+    """
+    Get character data for display.
+    Same responses as the Flask endpoint: the precomputed catalog (with an
+    ETag) or a filtered page.
+    """
+    catalog = sync_app.catalog
+    try:
+        query = sync_app._read_catalog_query(request.query)
+        if query is None:
+            return _conditional_response(
+                request, catalog.payload, 'application/json', catalog.etag
+            )
+        payload = catalog.query(*query)
+    except ValueError as e:
+        return _error_response(str(e), 400)
+    
+    return web.Response(body=payload, content_type='application/json')
+
+
+async def get_character_image(request):
+    """Proxy endpoint to serve character images (fetched without blocking)."""
+    character_name = request.match_info['character_name']
+    char_data = sync_app.matcher.db.get_character(character_name)
+    
+    if not char_data or not char_data.get('image_url'):
+        return _error_response('Character not found or no image', 404)
+    
+    try:
+        image = await request.app['image_proxy'].get(character_name, char_data['image_url'])
+    except ImageFetchError as e:
+        print(f"Error downloading image for {character_name}: {e}")
+        return _error_response('Image download failed', 500)
+    
+    return _conditional_response(
+        request, image.data, image.mimetype, image.etag,
+        headers={'Cache-Control': f'public, max-age={sync_app.IMAGE_CACHE_MAX_AGE}'}
+    )
+
+
+async def health(request):
+    """Liveness probe: the process is up and serving requests."""
+    return web.json_response({'status': 'ok'})
+
+
+async def readiness(request):
+    """Readiness probe: only 200 once the startup warm-up has finished."""
+    if not sync_app.ready.is_set():
+        return web.json_response({'ready': False}, status=503)
+    return web.json_response({'ready': True})
+
+
+async def prometheus_metrics(request):
+    """Prometheus text exposition of request, stage and audio metrics."""
+    return web.Response(
+        text=sync_app.metrics.render(),
+        headers={'Content-Type': MetricsRegistry.CONTENT_TYPE}
+    )
+
+
+async def _watch_catalog():
+    """
+    Hot-reload the external catalog like the Flask app does.
+    
+    The check runs on a thread every CATALOG_RELOAD_INTERVAL seconds: a
+    reload parses the catalog and rebuilds the matcher tables, which must
+    not stall the uploads in flight on the loop.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(sync_app.CATALOG_RELOAD_INTERVAL)
+        await loop.run_in_executor(None, sync_app._reload_catalog_if_changed)
+
+
+def _warm_up():
+    """Start the analysis worker processes, then warm up the pipeline."""
+    sync_app.analysis_pool.start()
+    sync_app.run_warmup()
+
+
+async def _start_background(web_app):
+    """Open the image client, watch the catalog and warm up without delaying startup."""
+    await web_app['image_proxy'].start()
+    if sync_app.CATALOG_PATH:
+        web_app['catalog_watcher'] = asyncio.create_task(_watch_catalog())
+    # /api/ready reports 503 until the warm-up in the executor is done
+    web_app['warmup'] = asyncio.get_running_loop().run_in_executor(
+        analysis_executor, _warm_up
+    )
+
+
+async def _stop_background(web_app):
+    """Stop the catalog watcher and close the image client."""
+    watcher = web_app.get('catalog_watcher')
+    if watcher is not None:
+        watcher.cancel()
+    await web_app['image_proxy'].close()
+
+
+async def create_app():
+    """Build the aiohttp application (also the gunicorn worker entry point)."""
+    web_app = web.Application(
+        middlewares=[_request_metrics],
+        # 0 disables aiohttp's body limit, like MAX_UPLOAD_BYTES=0 in Flask
+        client_max_size=sync_app.MAX_UPLOAD_BYTES
+    )
+    web_app['analysis_slots'] = asyncio.Semaphore(ASYNC_MAX_ANALYSES)
+    web_app['image_proxy'] = AsyncImageProxy(
+        sync_app.image_proxy,
+        max_concurrent_fetches=int(os.getenv('IMAGE_FETCH_CONCURRENCY', '4'))
+    )
+    web_app.on_startup.append(_start_background)
+    web_app.on_cleanup.append(_stop_background)
+    
+    # Route names match the Flask endpoints so metrics line up
+    web_app.router.add_post('/api/analyze', analyze_voice, name='analyze_voice')
+    web_app.router.add_get('/api/characters', get_characters, name='get_characters')
+    web_app.router.add_get(
+        '/api/image/{character_name:.+}', get_character_image, name='get_character_image'
+    )
+    web_app.router.add_get('/api/health', health, name='health')
+    web_app.router.add_get('/api/ready', readiness, name='readiness')
+    web_app.router.add_get('/metrics', prometheus_metrics, name='prometheus_metrics')
+    return web_app
+
+
+if __name__ == '__main__':
+    print("\n🎮 Voice Character Matcher Async API Server 🎤")
+    print("=" * 60)
+    print(f"✅ Serving /api/analyze, /api/characters and /api/image on port {ASYNC_PORT}")
+    print("ℹ️  The page, batch and streaming endpoints stay on the Flask app")
+    print("=" * 60 + "\n")
+    
+    web.run_app(create_app(), host='0.0.0.0', port=ASYNC_PORT)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Import Time Budget
+Measures cold import time of the core package, the catalog tooling and the
+Flask app in fresh interpreters, and checks that none of them pulls in the
+heavy audio stack before it is needed.
+
+Usage:
+    python benchmarks/import_time.py [--repeats 5]
+
+Exits with status 1 when a target is over its budget or imports a
+module it must not.
+"""
+import sys
+import os
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only load once audio is actually analyzed
+HEAVY_MODULES = ('scipy.signal', 'scipy.spatial', 'scipy.stats', 'numba', 'librosa.core.spectrum')
+
+# name -> (statement, seconds budget, modules that must not be imported)
+IMPORT_BUDGETS = {
+    'core': ('import core', 0.05, HEAVY_MODULES + ('numpy',)),
+    'catalog_store': ('import catalog_store', 0.3, HEAVY_MODULES),
+    'character_database': ('import character_database', 0.3, HEAVY_MODULES),
+    'app': ('import app', 1.0, HEAVY_MODULES),
+}
+
+_PROBE = '''
+import sys, time, json
+sys.path.insert(0, {root!r})
+sys.path.insert(0, {core!r})
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'modules': sorted(sys.modules)}}))
+'''
+
+
+def measure(statement, repeats):
+    """
+    Time a statement in fresh interpreters.
+    
+    Returns:
+        Tuple of (best seconds, set of modules loaded afterwards)
+    """
+    code = _PROBE.format(root=ROOT, core=os.path.join(ROOT, 'core'), statement=statement)
+    env = dict(os.environ, WARMUP='false')
+    best, modules = float('inf'), set()
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        best = min(best, result['seconds'])
+        modules = set(result['modules'])
+    return best, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+    
+    failures = 0
+    print(f"{'target':<20} {'seconds':>8} {'budget':>8}  status")
+    for name, (statement, budget, forbidden) in IMPORT_BUDGETS.items():
+        seconds, modules = measure(statement, args.repeats)
+        loaded = [module for module in forbidden if module in modules]
+        status = 'ok'
+        if seconds > budget:
+            status = 'OVER BUDGET'
+        if loaded:
+            status = f"imports {', '.join(loaded)}"
+        failures += status != 'ok'
+        print(f"{name:<20} {seconds:>8.3f} {budget:>8.3f}  {status}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Pitch Backend Comparison
+Reports accuracy and speed of each pitch backend against the original
+piptrack result and the true f0 of synthetic harmonic voices, plus the
+full extract_features time with each backend.
+
+Usage:
+    python benchmarks/pitch_backends.py [--sample-rate 44100]
+"""
+import sys
+import os
+import time
+import argparse
+
+# Add core to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'core'))
+
+import numpy as np
+from core import VoiceAnalyzer
+from pitch_estimators import compare_backends, PITCH_ESTIMATORS
+
+
+def harmonic_voice(f0, sample_rate, duration=3.0, seed=0):
+    """Synthesize a voice-like harmonic signal with vibrato and noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    vibrato = 1 + 0.01 * np.sin(2 * np.pi * 5 * t)
+    phase = 2 * np.pi * np.cumsum(f0 * vibrato) / sample_rate
+    signal = sum(np.sin(k * phase) / k for k in range(1, 6))
+    signal += 0.01 * rng.standard_normal(len(t))
+    return (0.3 * signal / np.max(np.abs(signal))).astype(np.float32)
+
+
+def extract_seconds(sample_rate, backend, audio, repeats=5):
+    """Best wall time of a full extract_features call with a pitch backend."""
+    analyzer = VoiceAnalyzer(sample_rate=sample_rate, pitch_backend=backend)
+    analyzer.extract_features(audio)
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        analyzer.extract_features(audio)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sample-rate', type=int, default=44100)
+    args = parser.parse_args()
+    
+    analyzer = VoiceAnalyzer(sample_rate=args.sample_rate)
+    print(
+        f"{'f0':>6}  {'backend':<10} {'mean Hz':>9} {'err Hz':>8} {'err %':>7} "
+        f"{'f0 err %':>9} {'ms':>8}"
+    )
+    for f0 in (90, 140, 200, 260, 380):
+        audio = harmonic_voice(f0, args.sample_rate)
+        report = compare_backends(analyzer, audio)
+        for name, row in report.items():
+            mean = row['mean_pitch']
+            err = row['abs_error_hz']
+            rel = row['relative_error']
+            f0_rel = abs(mean - f0) / f0 if mean is not None else None
+            print(
+                f"{f0:>6}  {name:<10} "
+                f"{mean if mean is not None else float('nan'):>9.1f} "
+                f"{err if err is not None else float('nan'):>8.2f} "
+                f"{100 * rel if rel is not None else float('nan'):>7.2f} "
+                f"{100 * f0_rel if f0_rel is not None else float('nan'):>9.2f} "
+                f"{1000 * row['seconds']:>8.2f}"
+            )
+    
+    audio = harmonic_voice(200, args.sample_rate, duration=5.0)
+    print(f"\nextract_features on 5 s at {args.sample_rate} Hz:")
+    for name in PITCH_ESTIMATORS:
+        seconds = extract_seconds(args.sample_rate, name, audio)
+        print(f"  {name:<10} {1000 * seconds:>8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+Times the analyzer feature stages, the character matcher and the full
+/api/analyze handler on deterministic synthetic inputs, and compares the
+results against a stored baseline.
+
+Usage:
+    python benchmarks/suite.py [--quick] [--only features,matcher,api]
+                               [--processes 3] [--output results.json]
+                               [--baseline benchmarks/baseline.json]
+                               [--update-baseline] [--threshold 0.25]
+
+Exits with status 1 when any benchmark's best time (the median over the
+processes) is slower than its baseline best time, scaled by its group's
+median slowdown, by more than its threshold, or when that median
+slowdown is itself beyond the default threshold.
+"""
+import gc
+import sys
+import os
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+# Add core to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'core'))
+
+import numpy as np
+import librosa
+from voice_analyzer import VoiceAnalyzer
+from voice_activity import VoiceActivityDetector
+from character_matcher import CharacterMatcher
+from catalog_store import write_catalog
+from warmup import to_wav_bytes
+from synthetic import SIGNALS, speech, synthetic_catalog
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+# Sub-millisecond timings jitter far more than the default allows
+MICRO_BENCHMARK_SECONDS = 0.001
+MICRO_THRESHOLD = 1.0
+# Short benchmarks keep sampling until this much time has been spent on them;
+# every benchmark takes at least SAMPLES_PER_PASS back-to-back samples a pass
+MIN_SAMPLE_SECONDS = 0.2
+SAMPLES_PER_PASS = 3
+
+SAMPLE_RATES = (16000, 44100)
+DURATIONS = (1, 5, 15)
+QUICK_DURATIONS = (1, 5)
+CATALOG_SIZES = (100, 1000, 10000)
+
+
+def prime():
+    """
+    Analyze the longest clip once, untimed, before any timing.
+    
+    The allocator keeps large freed blocks for reuse once it has seen
+    them, so every call gets faster after the first long clip. A long-running
+    server is in that state; priming puts --quick runs (no 15 s clips) in it
+    too, so they are comparable with the full run the baseline came from.
+    """
+    for sample_rate in SAMPLE_RATES:
+        VoiceAnalyzer(sample_rate=sample_rate).extract_features(
+            speech(sample_rate, max(DURATIONS))
+        )
+
+
+def time_calls(calls, repeats):
+    """
+    Time named callables.
+    
+    The repeats are interleaved: every pass visits each callable in turn,
+    so a burst of load from other processes slows one pass of many
+    benchmarks rather than every sample of one. Within a pass a callable
+    first runs once untimed, so the allocator and caches settle after the
+    other benchmarks' work, then is sampled SAMPLES_PER_PASS times back to
+    back, or more (at most ten) until it has run for MIN_SAMPLE_SECONDS /
+    repeats, giving sub-millisecond calls enough samples to find their best
+    time. The garbage collector only runs between passes, as in timeit.
+    
+    Args:
+        calls: Dictionary of benchmark name to callable
+        repeats: Number of passes
+    
+    Returns:
+        Dictionary of benchmark name to a dictionary with 'min' and
+        'median' seconds and 'repeats' (the number of samples)
+    """
+    samples = {key: [] for key in calls}
+    budget = MIN_SAMPLE_SECONDS / repeats
+    gc_enabled = gc.isenabled()
+    try:
+        for _ in range(repeats):
+            gc.collect()
+            gc.disable()
+            for key, function in calls.items():
+                timings = samples[key]
+                function()
+                spent = 0.0
+                for count in range(1, 11):
+                    start = time.perf_counter()
+                    function()
+                    elapsed = time.perf_counter() - start
+                    timings.append(elapsed)
+                    spent += elapsed
+                    if count >= SAMPLES_PER_PASS and spent >= budget:
+                        break
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {
+        key: {
+            'min': min(timings),
+            'median': statistics.median(timings),
+            'repeats': len(timings),
+        }
+        for key, timings in samples.items()
+    }
+
+
+def stage_calls(analyzer, audio_data):
+    """Callables for every VoiceAnalyzer stage, fed with precomputed inputs."""
+    spectrogram = analyzer._compute_spectrogram(audio_data)
+    rms = analyzer._extract_energy(audio_data, {})
+    vad = VoiceActivityDetector()
+    return {
+        'spectrogram': lambda: analyzer._compute_spectrogram(audio_data),
+        'pitch': lambda: analyzer._extract_pitch(audio_data, spectrogram, {}),
+        'energy': lambda: analyzer._extract_energy(audio_data, {}),
+        'speaking_rate': lambda: analyzer._extract_speaking_rate(rms, {}),
+        'beat_track': lambda: analyzer._extract_tempo(spectrogram, {}),
+        'spectral_centroid': lambda: analyzer._extract_spectral_centroid(spectrogram, {}),
+        'zero_crossing_rate': lambda: analyzer._extract_zero_crossing_rate(audio_data, {}),
+        'mfcc': lambda: analyzer._extract_mfcc(spectrogram, {}),
+        'vad': lambda: vad.trim(
+            audio_data, analyzer.sample_rate, analyzer.n_fft, analyzer.hop_length
+        ),
+    }
+
+
+def bench_features(durations):
+    """Per-stage calls on speech, plus extract_features on every signal."""
+    calls = {}
+    for sample_rate in SAMPLE_RATES:
+        analyzer = VoiceAnalyzer(sample_rate=sample_rate)
+        for duration in durations:
+            audio_data = speech(sample_rate, duration)
+            for stage, call in stage_calls(analyzer, audio_data).items():
+                calls[f'features/{stage}/speech/{sample_rate}/{duration}s'] = call
+            
+            for signal_name, generate in SIGNALS.items():
+                audio_data = generate(sample_rate, duration)
+                key = f'features/extract_features/{signal_name}/{sample_rate}/{duration}s'
+                calls[key] = (
+                    lambda analyzer=analyzer, audio_data=audio_data:
+                    analyzer.extract_features(audio_data)
+                )
+    return calls
+
+
+def bench_matcher():
+    """get_top_matches across synthetic catalog sizes, in both match modes."""
+    analyzer = VoiceAnalyzer(sample_rate=16000)
+    features = analyzer.extract_features(speech(16000, 3))
+    characteristics = analyzer.categorize_voice(features)
+    
+    calls = {}
+    directory = tempfile.mkdtemp(prefix='voice-bench-')
+    try:
+        for size in CATALOG_SIZES:
+            path = os.path.join(directory, f'catalog-{size}.jsonl')
+            write_catalog(synthetic_catalog(size), path, catalog_version='bench')
+            for mode in ('profile', 'embedding'):
+                # The catalog is read into memory here, so the file can go
+                matcher = CharacterMatcher(catalog_path=path, match_mode=mode)
+                calls[f'matcher/get_top_matches/{mode}/{size}'] = (
+                    lambda matcher=matcher:
+                    matcher.get_top_matches(features, characteristics, top_n=5)
+                )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return calls
+
+
+def bench_api(durations):
+    """The full /api/analyze handler through the Flask test client."""
+    # Configure the app before importing it: no warm-up, no result cache
+    os.environ['WARMUP'] = 'false'
+    os.environ['FEATURE_CACHE_ENTRIES'] = '0'
+    os.environ.setdefault('ANALYSIS_PROFILE', 'quality')
+    from app import app, analyzer
+    
+    client = app.test_client()
+    sample_rate = analyzer.sample_rate
+    calls = {}
+    
+    def post(body, content_type):
+        response = client.post('/api/analyze', data=body, content_type=content_type)
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/analyze returned {response.status_code}: {response.get_json()}")
+    
+    for duration in durations:
+        audio_data = speech(sample_rate, duration)
+        
+        pcm = audio_data.astype('<f4').tobytes()
+        calls[f'api/analyze/pcm/{sample_rate}/{duration}s'] = (
+            lambda pcm=pcm: post(pcm, f'audio/pcm;format=f32le;rate={sample_rate}')
+        )
+        
+        if shutil.which('ffmpeg'):
+            wav = to_wav_bytes(audio_data, sample_rate)
+            calls[f'api/analyze/wav/{sample_rate}/{duration}s'] = (
+                lambda wav=wav: post(wav, 'audio/wav')
+            )
+    return calls
+
+
+def environment():
+    """Library and machine versions the timings were taken with."""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'librosa': librosa.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def default_threshold(row, threshold):
+    """Allowed slowdown for a new baseline entry."""
+    if row['min'] < MICRO_BENCHMARK_SECONDS:
+        return max(threshold, MICRO_THRESHOLD)
+    return threshold
+
+
+def compare(results, baseline):
+    """
+    Compare best times against a baseline.
+    
+    The minimum over the repeats is compared rather than the median: noise
+    from other processes only ever adds time, so the best run is the most
+    repeatable figure on a shared machine.
+    
+    Machine speed is calibrated per group (features, matcher, api): the
+    group's median ratio of current to baseline time stands for how much
+    faster or slower the machine runs that kind of work right now, and
+    each benchmark is judged against its baseline scaled by that ratio. A
+    slowdown of the whole group would hide in its own median, so the median
+    itself must stay within the default threshold; as a median over many
+    benchmarks it is far steadier than any one of them.
+    
+    Args:
+        results: Timings from time_calls
+        baseline: Loaded baseline JSON
+    
+    Returns:
+        Tuple of (rows, group_rows). rows holds (key, current, baseline,
+        threshold, regressed) for every benchmark present in both, with
+        the baseline seconds scaled; group_rows holds (group, median ratio,
+        regressed) for every group
+    """
+    default_threshold = baseline.get('default_threshold', DEFAULT_THRESHOLD)
+    references = {}
+    for key, current in results.items():
+        reference = baseline.get('results', {}).get(key)
+        if reference is not None:
+            # Baselines recorded before best times were stored only have medians
+            references[key] = reference.get('min', reference['median'])
+    
+    ratios = {}
+    for key, reference_seconds in references.items():
+        ratios.setdefault(key.split('/')[0], []).append(results[key]['min'] / reference_seconds)
+    group_speeds = {group: statistics.median(values) for group, values in ratios.items()}
+    group_rows = [
+        (group, ratio, ratio > 1 + default_threshold)
+        for group, ratio in sorted(group_speeds.items())
+    ]
+    
+    rows = []
+    for key in sorted(references):
+        threshold = baseline['results'][key].get('threshold', default_threshold)
+        reference_seconds = references[key] * group_speeds[key.split('/')[0]]
+        current = results[key]['min']
+        regressed = current > reference_seconds * (1 + threshold)
+        rows.append((key, current, reference_seconds, threshold, regressed))
+    return rows, group_rows
+
+
+def measure(only, quick, keys=None):
+    """
+    Time the selected benchmark groups in this process.
+    
+    Args:
+        only: Comma-separated groups to run
+        quick: Fewer clip lengths and repeats
+        keys: Optional collection of benchmark names to restrict the run to
+    
+    Returns:
+        Timings from time_calls
+    """
+    groups = set(only.split(','))
+    durations = QUICK_DURATIONS if quick else DURATIONS
+    repeats = 5 if quick else 7
+    
+    prime()
+    calls = {}
+    if 'features' in groups:
+        calls.update(bench_features(durations))
+    if 'matcher' in groups:
+        calls.update(bench_matcher())
+    if 'api' in groups:
+        calls.update(bench_api(durations))
+    if keys is not None:
+        calls = {key: function for key, function in calls.items() if key in keys}
+    return time_calls(calls, repeats)
+
+
+def measure_in_processes(only, quick, processes, keys=None):
+    """
+    Run measure() in fresh interpreters.
+    
+    Some benchmarks settle into a faster or slower mode for the whole life
+    of a process (memory layout, allocator state), which no number of
+    repeats inside one process averages out, so every process's timings
+    are kept for combine_runs().
+    
+    Returns:
+        List of per-process timings from time_calls
+    """
+    runs = []
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(processes):
+            path = os.path.join(directory, f'{index}.json')
+            command = [
+                sys.executable, os.path.abspath(__file__), '--measure-only',
+                '--only', only, '--output', path,
+            ]
+            if quick:
+                command.append('--quick')
+            if keys is not None:
+                command.extend(['--keys', ','.join(sorted(keys))])
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            with open(path) as f:
+                runs.append(json.load(f)['results'])
+    return runs
+
+
+def combine_runs(runs):
+    """
+    Median over processes of each benchmark's best and median times.
+    
+    Returns:
+        Combined timings in the time_calls format
+    """
+    timings = {}
+    for run in runs:
+        for key, row in run.items():
+            timings.setdefault(key, []).append(row)
+    return {
+        key: {
+            'min': statistics.median(row['min'] for row in rows),
+            'median': statistics.median(row['median'] for row in rows),
+            'repeats': sum(row['repeats'] for row in rows),
+        }
+        for key, rows in timings.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='fewer clip lengths and repeats')
+    parser.add_argument('--only', default='features,matcher,api',
+                        help='comma-separated groups to run')
+    parser.add_argument('--processes', type=int, default=3,
+                        help='fresh interpreters to time in (median of their best times)')
+    parser.add_argument('--output', help='write the results JSON here')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='store these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slowdown for new baseline entries (0.25 = 25%%)')
+    # Internal: time in this process (optionally only --keys) and write --output
+    parser.add_argument('--measure-only', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--keys', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.measure_only or args.processes <= 1:
+        keys = set(args.keys.split(',')) if args.keys else None
+        runs = [measure(args.only, args.quick, keys)]
+    else:
+        runs = measure_in_processes(args.only, args.quick, args.processes)
+    results = combine_runs(runs)
+    
+    report = {'environment': environment(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.measure_only:
+        return 0
+    
+    for key, row in sorted(results.items()):
+        print(f"{key:<60} {1000 * row['min']:>10.3f} ms min {1000 * row['median']:>10.3f} ms median")
+    
+    if args.update_baseline:
+        previous = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                previous = json.load(f).get('results', {})
+        baseline = {
+            'environment': report['environment'],
+            'default_threshold': args.threshold,
+            'results': {
+                key: {
+                    'min': row['min'],
+                    'median': row['median'],
+                    # Keep hand-tuned thresholds for noisy benchmarks
+                    'threshold': previous.get(key, {}).get('threshold', default_threshold(row, args.threshold)),
+                }
+                for key, row in sorted(results.items())
+            },
+        }
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows, group_rows = compare(results, baseline)
+    flagged = {row[0] for row in rows if row[4]}
+    if flagged and args.processes > 1:
+        # Time the flagged benchmarks in as many fresh processes again and
+        # take the median over all of them, so a slowdown has to show up in
+        # most processes to fail the run
+        print(f"\nTiming {len(flagged)} flagged benchmarks again to confirm")
+        runs += measure_in_processes(args.only, args.quick, args.processes, flagged)
+        results = combine_runs(runs)
+        rows, group_rows = compare(results, baseline)
+    regressions = [row for row in rows if row[4]]
+    group_regressions = [row for row in group_rows if row[2]]
+    
+    print(f"\nCompared {len(rows)} benchmarks against {args.baseline}")
+    for group, ratio, _ in group_rows:
+        print(f"{group} ran at {ratio:.2f}x its baseline times (median); baseline times scaled to match")
+    for group, ratio, _ in group_regressions:
+        print(
+            f"REGRESSION {group}: {ratio:.2f}x its baseline times (median), "
+            f"allowed {1 + baseline.get('default_threshold', DEFAULT_THRESHOLD):.2f}x"
+        )
+    for key, current, reference, threshold, _ in regressions:
+        print(
+            f"REGRESSION {key}: {1000 * current:.3f} ms vs "
+            f"{1000 * reference:.3f} ms baseline (+{100 * (current / reference - 1):.0f}%, "
+            f"allowed +{100 * threshold:.0f}%)"
+        )
+    return 1 if regressions or group_regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
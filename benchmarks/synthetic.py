@@ -0,0 +1,83 @@
+"""
+Synthetic Benchmark Inputs
+Deterministic test signals and character catalogs for the benchmark suite.
+"""
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'core'))
+
+import numpy as np
+from warmup import synthetic_voice
+from catalog_store import ENERGY_CODES, TEMPO_CODES
+
+
+def tone(sample_rate, duration, f0=220.0):
+    """Pure sine tone."""
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    return (0.3 * np.sin(2 * np.pi * f0 * t)).astype(np.float32)
+
+
+def chirp(sample_rate, duration, f_start=80.0, f_end=400.0):
+    """Linear frequency sweep across the voice pitch band."""
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    rate = (f_end - f_start) / duration
+    phase = 2 * np.pi * (f_start * t + 0.5 * rate * t ** 2)
+    return (0.3 * np.sin(phase)).astype(np.float32)
+
+
+def noise(sample_rate, duration, seed=0):
+    """White noise (no pitch, no syllables)."""
+    rng = np.random.default_rng(seed)
+    return (0.1 * rng.standard_normal(int(duration * sample_rate))).astype(np.float32)
+
+
+def speech(sample_rate, duration, seed=0):
+    """Speech-like harmonic signal amplitude-modulated at a syllable rate."""
+    return synthetic_voice(sample_rate, duration=duration, seed=seed)
+
+
+SIGNALS = {
+    'tone': tone,
+    'chirp': chirp,
+    'noise': noise,
+    'speech': speech,
+}
+
+
+def synthetic_catalog(size, seed=0):
+    """
+    Build a catalog of randomly generated characters.
+    
+    Args:
+        size: Number of characters
+        seed: Seed for the random profiles
+    
+    Returns:
+        Dictionary of character name -> character data, in the same shape
+        as CharacterDatabase.get_all_characters()
+    """
+    rng = np.random.default_rng(seed)
+    energies = list(ENERGY_CODES)
+    tempos = list(TEMPO_CODES)
+    characters = {}
+    for i in range(size):
+        low = float(rng.uniform(80, 300))
+        characters[f'Character {i:06d}'] = {
+            'game': f'Game {i % 3}',
+            'description': 'Synthetic benchmark character',
+            'emoji': '🎮',
+            'image_url': '',
+            'voice_profile': {
+                'pitch_range': (low, low + float(rng.uniform(20, 80))),
+                'energy_level': energies[rng.integers(len(energies))],
+                'tempo': tempos[rng.integers(len(tempos))],
+                'personality': 'Synthetic',
+                'features': {
+                    'spectral_centroid': float(rng.uniform(1000, 4000)),
+                    'zero_crossing_rate': float(rng.uniform(0.02, 0.2)),
+                },
+            },
+        }
+    return characters
@@ -1,9 +1,55 @@
 """
 Core modules for Voice Character Matcher Web Version
+
+Names are imported lazily on first access, so tools that only need the
+catalog (or nothing at all) don't pay for the numpy/scipy/librosa stack.
 """
-from .voice_analyzer import VoiceAnalyzer
-from .character_matcher import CharacterMatcher
-from .character_database import CharacterDatabase
+import os
+import sys
+import importlib
+
+# The core modules import each other by plain name ("from metrics import
+# stage_timer"), so this directory has to be importable. Exports below are
+# resolved from those same top-level modules rather than core.<module>
+# copies, so every class and exception exists exactly once.
+_CORE_DIR = os.path.dirname(os.path.abspath(__file__))
+if _CORE_DIR not in sys.path:
+    sys.path.insert(0, _CORE_DIR)
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'VoiceAnalyzer': 'voice_analyzer',
+    'CharacterMatcher': 'character_matcher',
+    'CharacterDatabase': 'character_database',
+    'AudioDecoder': 'audio_decoder',
+    'InvalidAudioError': 'audio_decoder',
+    'get_analysis_profile': 'analysis_profiles',
+    'AnalysisPool': 'analysis_pool',
+    'PoolSaturatedError': 'analysis_pool',
+    'warm_up': 'warmup',
+    'FeatureCache': 'feature_cache',
+    'ImageProxy': 'image_proxy',
+    'ImageFetchError': 'image_proxy',
+    'AsyncImageProxy': 'async_image_proxy',
+    'CharacterCatalog': 'catalog',
+    'StreamSessionManager': 'stream_sessions',
+    'StreamCapacityError': 'stream_sessions',
+    'MetricsRegistry': 'metrics',
+    'stage_timer': 'metrics',
+    'RequestProfiler': 'request_profiler',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """Import the defining submodule the first time a name is used."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
 
-__all__ = ['VoiceAnalyzer', 'CharacterMatcher', 'CharacterDatabase']
 
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,245 @@
+"""
+Analysis Pool Module
+Runs CPU-bound feature extraction off the request thread with backpressure.
+"""
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from streaming_features import extract_features_blockwise
+from metrics import stage_timer
+from warmup import synthetic_voice
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when the analysis queue is full and the job was not accepted."""
+
+
+# The pool is started from a request thread of a multi-threaded server, so
+# forking would copy locks other threads hold at that moment into the
+# workers. spawn starts them clean; unlike forkserver it keeps no
+# process-wide server that a later fork of this process would inherit.
+_WORKER_CONTEXT = multiprocessing.get_context('spawn')
+
+# Analyzer owned by each worker process (set by _init_worker)
+_worker_analyzer = None
+
+
+def _init_worker(analyzer):
+    """Install the analyzer in a freshly started worker process and warm it up."""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+    # A spawned worker inherits none of the parent's imports or JIT-compiled
+    # kernels; pay for them here rather than in the first job. Failing here
+    # would break the whole pool, so a failed warm-up is left to that job.
+    try:
+        _analyze(analyzer, synthetic_voice(analyzer.sample_rate))
+    except Exception:
+        pass
+
+
+def _analyze(analyzer, audio_data, stage_timings=None):
+    """Extract and categorize features for one recording."""
+    features = analyzer.extract_features(audio_data, stage_timings)
+    characteristics = analyzer.categorize_voice(features)
+    return features, characteristics
+
+
+def _analyze_encoded(analyzer, decoder, audio_bytes, stage_timings=None):
+    """Decode and analyze an encoded recording block by block."""
+    with stage_timer(stage_timings, 'blockwise_extract'):
+        features = extract_features_blockwise(analyzer, decoder, audio_bytes)
+    characteristics = analyzer.categorize_voice(features)
+    return features, characteristics
+
+
+def _ping():
+    """No-op job that makes the pool start a worker process."""
+    return os.getpid()
+
+
+def _run_encoded_in_worker(decoder, audio_bytes):
+    """Process-pool entry point for block-wise analysis."""
+    stage_timings = {}
+    features, characteristics = _analyze_encoded(
+        _worker_analyzer, decoder, audio_bytes, stage_timings
+    )
+    return features, characteristics, stage_timings
+
+
+def _run_in_worker(audio_data):
+    """Process-pool entry point (stage timings travel back with the result)."""
+    stage_timings = {}
+    features, characteristics = _analyze(_worker_analyzer, audio_data, stage_timings)
+    return features, characteristics, stage_timings
+
+
+class AnalysisPool:
+    """Bounded executor for VoiceAnalyzer.extract_features/categorize_voice."""
+    
+    def __init__(self, analyzer, workers=0, max_pending=None):
+        """
+        Initialize the analysis pool.
+        
+        Args:
+            analyzer: VoiceAnalyzer used inline and copied into each worker
+            workers: Number of worker processes (0 runs analysis inline on
+                the calling thread)
+            max_pending: Maximum jobs queued or running at once; further
+                jobs are rejected with PoolSaturatedError (default: twice
+                the worker count, unbounded when running inline)
+        """
+        self.analyzer = analyzer
+        self.workers = workers
+        
+        if max_pending is None:
+            max_pending = 2 * workers if workers > 0 else 0
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending) if max_pending > 0 else None
+        
+        # The worker processes are started on first use, in the process
+        # that uses them: an executor built before a pre-forking server
+        # forks would share its queues and manager thread state across
+        # every forked worker and deadlock them
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+    
+    def _get_executor(self):
+        """This process's worker pool, started on first call (None when inline)."""
+        if self.workers <= 0:
+            return None
+        pid = os.getpid()
+        with self._executor_lock:
+            if self._executor is None or self._executor_pid != pid:
+                # After a fork the inherited executor belongs to the parent;
+                # drop it without shutting it down and start our own
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=_WORKER_CONTEXT,
+                    initializer=_init_worker,
+                    initargs=(self.analyzer,)
+                )
+                self._executor_pid = pid
+            return self._executor
+    
+    def start(self):
+        """
+        Start this process's worker processes now rather than on the first job.
+        
+        Spawned workers import and warm up the audio stack before taking
+        jobs, which takes seconds; servers call this before accepting
+        requests.
+        """
+        executor = self._get_executor()
+        if executor is not None:
+            for future in [executor.submit(_ping) for _ in range(self.workers)]:
+                future.result()
+    
+    def _discard_executor(self, executor):
+        """Drop a broken pool so the next job starts a fresh one."""
+        with self._executor_lock:
+            # Concurrent jobs fail together; only the first replaces the pool
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+    
+    def _acquire_slot(self):
+        """Reserve a queue slot or fail fast when the queue is full."""
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            raise PoolSaturatedError("Analysis queue is full")
+    
+    def _release_slot(self, *_):
+        """Return a queue slot (also used as a future done-callback)."""
+        if self._slots is not None:
+            self._slots.release()
+    
+    def _submit(self, function, worker_function, args, stage_timings, inline):
+        """
+        Run a job inline or in a worker, holding a queue slot meanwhile.
+        
+        Args:
+            function: Inline implementation, called as
+                function(analyzer, *args, stage_timings)
+            worker_function: Process-pool entry point, called as
+                worker_function(*args)
+            args: Job arguments
+            stage_timings: Optional dict that receives per-stage seconds
+            inline: Run on the calling thread even when workers exist
+        """
+        executor = None if inline else self._get_executor()
+        if executor is None:
+            self._acquire_slot()
+            try:
+                return function(self.analyzer, *args, stage_timings)
+            finally:
+                self._release_slot()
+        
+        try:
+            result = self._run_in_pool(executor, worker_function, args)
+        except BrokenProcessPool:
+            # A worker died (OOM kill, crash in native code) and took the
+            # pool with it: start a new one and retry once
+            self._discard_executor(executor)
+            result = self._run_in_pool(self._get_executor(), worker_function, args)
+        features, characteristics, worker_timings = result
+        if stage_timings is not None:
+            stage_timings.update(worker_timings)
+        return features, characteristics
+    
+    def _run_in_pool(self, executor, worker_function, args):
+        """Run one job in the pool, holding a queue slot until it finishes."""
+        self._acquire_slot()
+        try:
+            future = executor.submit(worker_function, *args)
+        except Exception:
+            self._release_slot()
+            raise
+        # The slot is held until the worker finishes, not until we stop waiting
+        future.add_done_callback(self._release_slot)
+        return future.result()
+    
+    def analyze(self, audio_data, stage_timings=None, inline=False):
+        """
+        Extract and categorize voice features.
+        
+        Args:
+            audio_data: Audio data as numpy array
+            stage_timings: Optional dict that receives per-stage seconds
+            inline: Run on the calling thread even when worker processes
+                exist (e.g. so a profiler on this thread sees the work)
+        
+        Returns:
+            Tuple of (features, characteristics)
+        """
+        return self._submit(_analyze, _run_in_worker, (audio_data,), stage_timings, inline)
+    
+    def analyze_encoded(self, audio_bytes, decoder, stage_timings=None, inline=False):
+        """
+        Decode and analyze an encoded recording block by block.
+        
+        Peak memory does not grow with the recording's length (see
+        streaming_features.extract_features_blockwise).
+        
+        Args:
+            audio_bytes: Encoded audio file contents
+            decoder: AudioDecoder used for the ffmpeg pipe
+            stage_timings: Optional dict that receives per-stage seconds
+            inline: Run on the calling thread even when worker processes exist
+        
+        Returns:
+            Tuple of (features, characteristics)
+        """
+        return self._submit(
+            _analyze_encoded, _run_encoded_in_worker, (decoder, audio_bytes),
+            stage_timings, inline
+        )
+    
+    def shutdown(self, wait=True):
+        """Stop this process's worker processes."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+            owned = self._executor_pid == os.getpid()
+        if executor is not None and owned:
+            executor.shutdown(wait=wait)
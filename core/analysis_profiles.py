@@ -0,0 +1,85 @@
+"""
+Analysis Profiles Module
+Named sample-rate/resampling presets for decoding and feature extraction.
+"""
+
+# Reference frame settings the feature thresholds were tuned with
+REFERENCE_SAMPLE_RATE = 44100
+REFERENCE_N_FFT = 2048
+REFERENCE_HOP_LENGTH = 512
+
+ANALYSIS_PROFILES = {
+    # Original behaviour: full-band audio, high quality resampling
+    'quality': {
+        'sample_rate': 44100,
+        'fast_resample': False
+    },
+    # Speech features (pitch <= 500 Hz) only need a narrow band
+    'fast': {
+        'sample_rate': 16000,
+        'fast_resample': True
+    },
+}
+
+
+def _nearest_fast_fft_size(n):
+    """Closest size to n with no prime factor above 5 (fast for pocketfft)."""
+    def smooth(m):
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        return m == 1
+    
+    for distance in range(n):
+        for candidate in (n - distance, n + distance):
+            if candidate > 0 and smooth(candidate):
+                return candidate
+    return n
+
+
+def frame_settings(sample_rate):
+    """
+    Choose FFT and hop sizes that keep frame durations at the reference.
+    
+    The window stays at ~46 ms and the hop at ~11.6 ms (the 2048/512
+    samples of 44.1 kHz) so pitch resolution, onset envelopes and tempo
+    estimates (and therefore the thresholds in
+    VoiceAnalyzer.categorize_voice) behave the same at any rate. Rounding
+    to a power of two is too coarse (1024 samples at 16 kHz is a 64 ms
+    window and shifts tempo estimates by ~10%), but the exactly scaled
+    window can be prime (743 at 16 kHz) and make every FFT 2-3x slower, so
+    it is moved to the nearest size with small factors (750 = 46.9 ms).
+    
+    Args:
+        sample_rate: Analysis sample rate
+    
+    Returns:
+        Tuple of (n_fft, hop_length)
+    """
+    scale = sample_rate / REFERENCE_SAMPLE_RATE
+    n_fft = _nearest_fast_fft_size(int(round(REFERENCE_N_FFT * scale)))
+    hop_length = int(round(REFERENCE_HOP_LENGTH * scale))
+    return n_fft, hop_length
+
+
+def get_analysis_profile(name='quality', sample_rate=None):
+    """
+    Resolve an analysis profile.
+    
+    Args:
+        name: Profile name ('quality' or 'fast')
+        sample_rate: Optional sample rate overriding the profile default
+    
+    Returns:
+        Dictionary with 'name', 'sample_rate', 'n_fft', 'hop_length'
+        and 'fast_resample'
+    """
+    if name not in ANALYSIS_PROFILES:
+        available = ', '.join(sorted(ANALYSIS_PROFILES))
+        raise ValueError(f"Unknown analysis profile '{name}' (available: {available})")
+    
+    profile = dict(ANALYSIS_PROFILES[name], name=name)
+    if sample_rate:
+        profile['sample_rate'] = int(sample_rate)
+    profile['n_fft'], profile['hop_length'] = frame_settings(profile['sample_rate'])
+    return profile
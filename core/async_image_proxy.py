@@ -0,0 +1,114 @@
+"""
+Async Image Proxy Module
+Non-blocking character image fetches for the asyncio server.
+"""
+import os
+import asyncio
+import aiohttp
+from image_proxy import ImageFetchError
+
+
+class AsyncImageProxy:
+    """
+    Event-loop front end to an ImageProxy.
+    
+    Shares the proxy's memory and disk caches, so images fetched by either
+    server are reused by both. Cold images are downloaded with aiohttp
+    (concurrent requests for the same image share one fetch) and the small
+    cache file reads and writes run in the default executor.
+    """
+    
+    def __init__(self, proxy, max_concurrent_fetches=4):
+        """
+        Initialize the async image proxy.
+        
+        Args:
+            proxy: ImageProxy providing the caches, timeout and size limits
+            max_concurrent_fetches: Upstream fetches allowed at once; further
+                cold requests wait at most `proxy.timeout` for a slot
+        """
+        self.proxy = proxy
+        self.max_concurrent_fetches = max_concurrent_fetches
+        self._fetch_slots = asyncio.Semaphore(max_concurrent_fetches)
+        self._inflight = {}
+        self._session = None
+    
+    async def start(self):
+        """Open the pooled HTTP client session (call on the serving loop)."""
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=self.proxy.timeout, sock_read=self.proxy.timeout
+            ),
+            connector=aiohttp.TCPConnector(limit_per_host=self.max_concurrent_fetches),
+            headers={
+                'User-Agent': 'VoiceCharacterMatcher/1.0',
+                'Accept': 'image/*'
+            }
+        )
+    
+    async def close(self):
+        """Close the HTTP client session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def get(self, name, image_url):
+        """
+        Get an image, fetching it from upstream at most once.
+        
+        Args:
+            name: Character name (used for the cache file name)
+            image_url: Upstream image URL
+        
+        Returns:
+            CachedImage(data, etag, mimetype)
+        """
+        path = self.proxy.cache_path(name, image_url)
+        image = self.proxy.lookup(path)
+        if image is not None:
+            return image
+        
+        # Single-flight: the first caller starts the load, the others await it
+        flight = self._inflight.get(path)
+        if flight is None:
+            flight = asyncio.ensure_future(self._load(path, image_url))
+            self._inflight[path] = flight
+            flight.add_done_callback(lambda _: self._inflight.pop(path, None))
+        # Shielded so one client disconnecting doesn't cancel the shared fetch
+        return await asyncio.shield(flight)
+    
+    async def _load(self, path, image_url):
+        """Read the image from disk, downloading it first if necessary."""
+        loop = asyncio.get_running_loop()
+        try:
+            if os.path.exists(path):
+                return await loop.run_in_executor(None, self.proxy.load_file, path)
+            data = await self._download(image_url)
+            return await loop.run_in_executor(None, self.proxy.store, path, data)
+        except ImageFetchError:
+            raise
+        except Exception as e:
+            raise ImageFetchError(str(e))
+    
+    async def _download(self, url):
+        """Fetch image bytes without blocking the loop, following redirects."""
+        try:
+            await asyncio.wait_for(self._fetch_slots.acquire(), self.proxy.timeout)
+        except asyncio.TimeoutError:
+            raise ImageFetchError("Too many concurrent image downloads")
+        try:
+            async with self._session.get(url, max_redirects=self.proxy.max_redirects) as response:
+                if response.status != 200:
+                    raise ImageFetchError(f"Upstream returned HTTP {response.status}")
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(65536):
+                    body += chunk
+                    if len(body) > self.proxy.max_image_bytes:
+                        raise ImageFetchError("Image exceeds the maximum allowed size")
+                return bytes(body)
+        except aiohttp.TooManyRedirects:
+            raise ImageFetchError("Too many redirects")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ImageFetchError(f"Image download failed: {e}")
+        finally:
+            self._fetch_slots.release()
@@ -0,0 +1,319 @@
+"""
+Audio Decoder Module
+Decodes uploaded audio blobs in memory by piping them through ffmpeg.
+"""
+import asyncio
+import subprocess
+import threading
+import numpy as np
+import librosa
+
+
+# Raw PCM sample formats accepted by decode_pcm: (numpy dtype, full scale)
+PCM_FORMATS = {
+    'f32le': ('<f4', None),
+    's16le': ('<i2', 32768.0),
+}
+
+
+class InvalidAudioError(ValueError):
+    """Raised when uploaded audio is malformed (a client error, not a server fault)."""
+
+
+def _require_finite(audio_data):
+    """Reject NaN/Inf samples (float uploads pass them through unchanged)."""
+    if not np.isfinite(audio_data).all():
+        raise InvalidAudioError("Audio samples must be finite")
+
+
+class AudioDecoder:
+    """Decodes compressed audio (webm/ogg/wav) to mono float32 samples."""
+    
+    def __init__(self, sample_rate=44100, ffmpeg_path='ffmpeg', fast_resample=False,
+                 max_duration=None):
+        """
+        Initialize the audio decoder.
+        
+        Args:
+            sample_rate: Sample rate to decode the audio at
+            ffmpeg_path: Path to the ffmpeg executable
+            fast_resample: Use a short resampling filter (cheaper, slightly
+                less accurate near Nyquist)
+            max_duration: Seconds of audio to decode at most; anything after
+                that is never decoded (default: no limit)
+        """
+        self.sample_rate = sample_rate
+        self.ffmpeg_path = ffmpeg_path
+        self.fast_resample = fast_resample
+        self.max_duration = max_duration
+    
+    def _build_command(self, streaming=False):
+        """Build the ffmpeg command that reads stdin and writes raw PCM to stdout."""
+        command = [
+            self.ffmpeg_path,
+            '-nostdin',
+            '-hide_banner',
+            '-loglevel', 'error',
+        ]
+        if streaming:
+            # Start decoding as soon as the container header is parsed
+            # instead of buffering seconds of input to probe it
+            command += ['-probesize', '32768', '-analyzeduration', '0']
+        command += [
+            '-i', 'pipe:0',
+            '-f', 'f32le',
+            '-acodec', 'pcm_f32le',
+            '-ac', '1',
+            '-ar', str(self.sample_rate),
+        ]
+        if self.fast_resample:
+            command += ['-af', f'aresample={self.sample_rate}:filter_size=8:phase_shift=6']
+        if self.max_duration and not streaming:
+            # ffmpeg stops reading and decoding once this much is output
+            command += ['-t', str(self.max_duration)]
+        return command + ['pipe:1']
+    
+    def decode(self, audio_bytes):
+        """
+        Decode an audio blob without touching the disk.
+        
+        Args:
+            audio_bytes: Encoded audio file contents (bytes)
+        
+        Returns:
+            Tuple of (audio_data, sample_rate) where audio_data is a
+            mono float32 numpy array
+        """
+        if not audio_bytes:
+            raise InvalidAudioError("Audio data is empty")
+        
+        try:
+            result = subprocess.run(
+                self._build_command(),
+                input=audio_bytes,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=False
+            )
+        except FileNotFoundError:
+            raise RuntimeError("ffmpeg is not installed or not on PATH")
+        
+        return self._decoded(result.returncode, result.stdout, result.stderr)
+    
+    async def decode_async(self, audio_bytes):
+        """
+        Decode an audio blob through asyncio subprocess pipes.
+        
+        Same result as decode(), but the event loop keeps serving other
+        requests while ffmpeg runs. If the awaiting task is cancelled
+        (e.g. the client disconnected), ffmpeg is killed.
+        
+        Args:
+            audio_bytes: Encoded audio file contents (bytes)
+        
+        Returns:
+            Tuple of (audio_data, sample_rate)
+        """
+        if not audio_bytes:
+            raise InvalidAudioError("Audio data is empty")
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self._build_command(),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            raise RuntimeError("ffmpeg is not installed or not on PATH")
+        
+        try:
+            stdout, stderr = await process.communicate(audio_bytes)
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        
+        return self._decoded(process.returncode, stdout, stderr)
+    
+    def _decoded(self, returncode, stdout, stderr):
+        """Turn a finished ffmpeg run into (audio_data, sample_rate)."""
+        if returncode != 0:
+            message = stderr.decode('utf-8', errors='replace').strip()
+            raise InvalidAudioError(f"Could not decode audio: {message or 'ffmpeg failed'}")
+        
+        audio_data = np.frombuffer(stdout, dtype='<f4')
+        _require_finite(audio_data)
+        return audio_data, self.sample_rate
+    
+    def decode_pcm(self, pcm_bytes, sample_format='f32le', sample_rate=None):
+        """
+        Wrap raw mono PCM without running ffmpeg.
+        
+        float32 input is wrapped zero-copy with np.frombuffer; int16 input
+        is scaled to [-1, 1). Audio at another rate is resampled in-process.
+        
+        Args:
+            pcm_bytes: Raw little-endian samples
+            sample_format: 'f32le' or 's16le'
+            sample_rate: Rate the samples were captured at (default: the
+                decoder's rate)
+        
+        Returns:
+            Tuple of (audio_data, sample_rate)
+        """
+        if sample_format not in PCM_FORMATS:
+            available = ', '.join(sorted(PCM_FORMATS))
+            raise InvalidAudioError(f"Unsupported PCM format '{sample_format}' (available: {available})")
+        dtype, full_scale = PCM_FORMATS[sample_format]
+        
+        if not pcm_bytes:
+            raise InvalidAudioError("Audio data is empty")
+        if len(pcm_bytes) % np.dtype(dtype).itemsize:
+            raise InvalidAudioError(f"PCM body is not a whole number of {sample_format} samples")
+        
+        sample_rate = self.sample_rate if sample_rate is None else int(sample_rate)
+        if sample_rate <= 0:
+            raise InvalidAudioError("PCM sample rate must be positive")
+        
+        audio_data = np.frombuffer(pcm_bytes, dtype=dtype)
+        if self.max_duration:
+            # Truncate the view before any conversion or resampling work
+            audio_data = audio_data[:int(self.max_duration * sample_rate)]
+        if full_scale is not None:
+            audio_data = audio_data.astype(np.float32) / full_scale
+        _require_finite(audio_data)
+        
+        if sample_rate != self.sample_rate:
+            audio_data = librosa.resample(
+                audio_data,
+                orig_sr=sample_rate,
+                target_sr=self.sample_rate,
+                res_type='soxr_qq' if self.fast_resample else 'soxr_hq'
+            )
+        return audio_data, self.sample_rate
+    
+    def open_stream(self, on_samples):
+        """
+        Start an incremental decode for audio that arrives in chunks.
+        
+        max_duration is not applied here: ffmpeg exiting early would break
+        the pipe for chunks still in flight, so the consumer caps samples.
+        
+        Args:
+            on_samples: Callback receiving each decoded float32 block
+        
+        Returns:
+            DecoderStream accepting encoded chunks via write()
+        """
+        return DecoderStream(self._build_command(streaming=True), on_samples)
+
+
+class DecoderStream:
+    """A running ffmpeg process fed chunk by chunk (e.g. MediaRecorder output)."""
+    
+    def __init__(self, command, on_samples, read_size=65536, stderr_limit=8192):
+        """
+        Start ffmpeg, a reader thread that forwards decoded samples and one
+        that drains its error output.
+        
+        Args:
+            command: ffmpeg command reading stdin and writing f32le to stdout
+            on_samples: Callback receiving each decoded float32 block
+            read_size: Maximum bytes read from ffmpeg at a time
+            stderr_limit: Bytes of error output kept for the failure message
+        """
+        try:
+            self._process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        except FileNotFoundError:
+            raise RuntimeError("ffmpeg is not installed or not on PATH")
+        
+        self._on_samples = on_samples
+        self._read_size = read_size
+        self._stderr_limit = stderr_limit
+        self._stderr = bytearray()
+        self.error = None
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+        self._stderr_reader = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_reader.start()
+    
+    def _read_loop(self):
+        """Forward decoded PCM to the callback until ffmpeg closes stdout."""
+        pending = b''
+        stdout = self._process.stdout
+        while True:
+            data = stdout.read1(self._read_size)
+            if not data:
+                break
+            data = pending + data
+            usable = len(data) - len(data) % 4
+            pending = data[usable:]
+            if not usable or self.error is not None:
+                # Keep draining so ffmpeg never blocks on a full pipe
+                continue
+            try:
+                self._on_samples(np.frombuffer(data[:usable], dtype='<f4'))
+            except Exception as e:
+                self.error = e
+    
+    def _drain_stderr(self):
+        """
+        Read ffmpeg's error output as it is written, keeping only the start.
+        
+        A corrupt stream can log an error per frame; left unread, the pipe
+        fills and ffmpeg (and then write()) blocks.
+        """
+        stderr = self._process.stderr
+        while True:
+            data = stderr.read1(4096)
+            if not data:
+                break
+            room = self._stderr_limit - len(self._stderr)
+            if room > 0:
+                self._stderr += data[:room]
+    
+    def write(self, chunk):
+        """Feed the next encoded chunk to ffmpeg."""
+        try:
+            self._process.stdin.write(chunk)
+            self._process.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            raise ValueError("Audio decoder stopped; the stream could not be decoded")
+    
+    def close(self, timeout=30):
+        """
+        Signal end of input and wait for every sample to be delivered.
+        
+        Args:
+            timeout: Seconds to wait for ffmpeg to finish
+        """
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._reader.join(timeout)
+        try:
+            returncode = self._process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.abort()
+            raise ValueError("Timed out decoding audio stream")
+        
+        if returncode != 0:
+            self._stderr_reader.join(timeout)
+            message = self._stderr.decode('utf-8', errors='replace').strip()
+            raise InvalidAudioError(f"Could not decode audio: {message or 'ffmpeg failed'}")
+        if self.error is not None:
+            raise self.error
+    
+    def abort(self):
+        """Stop decoding immediately and discard the stream."""
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
@@ -0,0 +1,97 @@
+"""
+Catalog Module
+Precomputed, indexed /api/characters responses.
+"""
+import json
+import hashlib
+
+
+class CharacterCatalog:
+    """
+    Immutable, pre-serialized views of the character database.
+    
+    The full catalog payload is serialized once with an ETag, and every
+    character is pre-serialized individually so filtered or paginated
+    responses are assembled by joining bytes.
+    """
+    
+    # Query parameter -> indexed database field
+    FILTERS = {
+        'game': 'game',
+        'energy': 'energy_level',
+        'tempo': 'tempo',
+    }
+    
+    def __init__(self, db):
+        """
+        Build all payloads from the database.
+        
+        Args:
+            db: CharacterDatabase instance
+        """
+        self.db = db
+        characters = db.get_all_characters()
+        
+        self.names = tuple(characters)
+        self._positions = {name: i for i, name in enumerate(self.names)}
+        self._items = tuple(
+            self._serialize({
+                'name': name,
+                'game': data['game'],
+                'emoji': data['emoji'],
+                'description': data['description'],
+                'image_url': data['image_url']
+            })
+            for name, data in characters.items()
+        )
+        
+        self.payload = b'{"characters":[' + b','.join(self._items) + b']}\n'
+        self.etag = hashlib.sha1(self.payload).hexdigest()
+    
+    @staticmethod
+    def _serialize(value):
+        """Serialize like Flask's default JSON provider (sorted, compact)."""
+        return json.dumps(value, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    
+    def _filtered_positions(self, filters):
+        """Catalog positions matching every filter, via the secondary indexes."""
+        positions = None
+        for param, value in filters.items():
+            names = self.db.get_character_names_by_field(self.FILTERS[param], value)
+            matched = {self._positions[name] for name in names}
+            positions = matched if positions is None else positions & matched
+        if positions is None:
+            return range(len(self.names))
+        return sorted(positions)
+    
+    def query(self, filters=None, offset=0, limit=None):
+        """
+        Build a filtered and/or paginated payload.
+        
+        Args:
+            filters: Dictionary of query parameter -> value (keys from FILTERS)
+            offset: Number of matching characters to skip
+            limit: Maximum characters to return (default: all)
+        
+        Returns:
+            JSON payload bytes with 'characters', 'total', 'offset' and 'limit'
+        """
+        filters = filters or {}
+        unknown = set(filters) - set(self.FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("offset and limit must be non-negative")
+        
+        positions = self._filtered_positions(filters)
+        end = None if limit is None else offset + limit
+        page = positions[offset:end]
+        
+        return (
+            b'{"characters":[' + b','.join(self._items[i] for i in page) + b'],' +
+            self._serialize({
+                'total': len(positions),
+                'offset': offset,
+                'limit': limit
+            })[1:] + b'\n'
+        )
@@ -0,0 +1,173 @@
+"""
+Catalog Store Module
+Reads and writes the external character catalog: a JSON-lines file with
+the descriptive fields plus a memory-mapped columnar .npy file with the
+numeric voice profiles used for matching.
+
+Usage:
+    python core/catalog_store.py export data/catalog.jsonl [--version V]
+"""
+import os
+import sys
+import json
+import tempfile
+import numpy as np
+
+
+SCHEMA_VERSION = 1
+
+# Ordinal codes for the categorical voice attributes
+ENERGY_CODES = {'soft': 0, 'moderate': 1, 'loud': 2}
+TEMPO_CODES = {'slow': 0, 'moderate': 1, 'fast': 2}
+
+# One row per character, in the same order as the JSON-lines records
+COLUMN_DTYPE = np.dtype([
+    ('pitch_min', '<f4'),
+    ('pitch_max', '<f4'),
+    ('pitch_mid', '<f4'),
+    ('energy_code', 'u1'),
+    ('tempo_code', 'u1'),
+])
+
+
+def _atomic_write(path, write):
+    """Write a file via a temporary sibling and rename it into place."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def write_catalog(characters, path, catalog_version):
+    """
+    Write a catalog as a JSON-lines file plus its columnar .npy file.
+    
+    The columns go to a version-named file first; replacing the JSON-lines
+    file (whose header names that column file) is the atomic commit point,
+    so readers always see a matching pair. The column file the replaced
+    header named is deleted afterwards: processes that already mapped it
+    keep their pages, and a reader caught between the two files fails its
+    reload and picks up the new version on its next check.
+    
+    Args:
+        characters: Dictionary of character name -> character data
+        path: Path of the .jsonl file to write
+        catalog_version: Version string recorded in the header
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    directory = os.path.dirname(os.path.abspath(path))
+    columns_name = f'{stem}.{catalog_version}.npy'
+    columns_path = os.path.join(directory, columns_name)
+    
+    columns = np.zeros(len(characters), dtype=COLUMN_DTYPE)
+    for row, char in enumerate(characters.values()):
+        profile = char['voice_profile']
+        pitch_min, pitch_max = profile['pitch_range']
+        columns[row] = (
+            pitch_min,
+            pitch_max,
+            (pitch_min + pitch_max) / 2,
+            ENERGY_CODES[profile['energy_level']],
+            TEMPO_CODES[profile['tempo']],
+        )
+    _atomic_write(columns_path, lambda f: np.save(f, columns, allow_pickle=False))
+    
+    header = {
+        'schema_version': SCHEMA_VERSION,
+        'catalog_version': str(catalog_version),
+        'count': len(characters),
+        'columns': columns_name,
+    }
+    
+    def write_records(f):
+        f.write((json.dumps(header) + '\n').encode('utf-8'))
+        for name, char in characters.items():
+            record = dict(char, name=name)
+            f.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+    
+    superseded = _columns_name(path)
+    _atomic_write(path, write_records)
+    
+    if superseded and superseded != columns_name:
+        try:
+            os.unlink(os.path.join(directory, superseded))
+        except OSError:
+            pass
+
+
+def _columns_name(path):
+    """Column file named by an existing catalog's header, or None."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            columns = json.loads(f.readline()).get('columns')
+    except (OSError, ValueError, AttributeError):
+        return None
+    # Only ever a sibling file name; never follow a path out of the directory
+    if not isinstance(columns, str) or os.path.basename(columns) != columns:
+        return None
+    return columns
+
+
+def read_catalog(path):
+    """
+    Load a catalog written by write_catalog.
+    
+    Args:
+        path: Path of the .jsonl file
+    
+    Returns:
+        Tuple of (header, characters, columns) where characters maps name
+        to character data and columns is a read-only memory-mapped array
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('schema_version') != SCHEMA_VERSION:
+            raise ValueError(
+                f"Unsupported catalog schema version {header.get('schema_version')} "
+                f"(expected {SCHEMA_VERSION})"
+            )
+        
+        characters = {}
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            name = record.pop('name')
+            profile = record['voice_profile']
+            profile['pitch_range'] = tuple(profile['pitch_range'])
+            characters[name] = record
+    
+    columns_path = os.path.join(os.path.dirname(os.path.abspath(path)), header['columns'])
+    columns = np.load(columns_path, mmap_mode='r', allow_pickle=False)
+    
+    if columns.dtype != COLUMN_DTYPE:
+        raise ValueError(f"Unexpected column layout in {header['columns']}")
+    if not (header['count'] == len(characters) == len(columns)):
+        raise ValueError("Catalog records and columns are out of sync")
+    
+    return header, characters, columns
+
+
+if __name__ == '__main__':
+    import argparse
+    
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from character_database import CharacterDatabase
+    
+    parser = argparse.ArgumentParser(description='Character catalog tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export = subparsers.add_parser('export', help='Export the built-in catalog')
+    export.add_argument('path', help='Output .jsonl path')
+    export.add_argument('--version', default='1', help='Catalog version string')
+    args = parser.parse_args()
+    
+    db = CharacterDatabase()
+    os.makedirs(os.path.dirname(os.path.abspath(args.path)), exist_ok=True)
+    write_catalog(db.get_all_characters(), args.path, args.version)
+    print(f"Wrote {len(db.get_all_characters())} characters to {args.path}")
@@ -7,9 +7,46 @@ Contains voice characteristics for various Supercell game characters.
 class CharacterDatabase:
     """Database of Supercell gaming characters with voice characteristics."""
     
-    def __init__(self):
-        """Initialize character database with voice profiles."""
-        self.characters = self._create_character_profiles()
+    # Fields with a secondary index: (top-level or voice_profile key)
+    INDEXED_FIELDS = ('game', 'energy_level', 'tempo')
+    
+    def __init__(self, catalog_path=None):
+        """
+        Initialize character database with voice profiles.
+        
+        Args:
+            catalog_path: Optional external catalog (.jsonl written by
+                catalog_store.write_catalog); the built-in profiles are
+                used when omitted
+        """
+        self.catalog_path = catalog_path
+        self.version = 'builtin'
+        self.columns = None
+        
+        if catalog_path:
+            from catalog_store import read_catalog
+            header, self.characters, self.columns = read_catalog(catalog_path)
+            self.version = header['catalog_version']
+        else:
+            self.characters = self._create_character_profiles()
+        self._indexes = self._build_indexes()
+    
+    def _build_indexes(self):
+        """
+        Build secondary indexes mapping field value -> character names.
+        
+        Returns:
+            Dictionary of {field: {value: tuple of names in catalog order}}
+        """
+        indexes = {field: {} for field in self.INDEXED_FIELDS}
+        for name, char in self.characters.items():
+            for field in self.INDEXED_FIELDS:
+                value = char[field] if field in char else char['voice_profile'][field]
+                indexes[field].setdefault(value, []).append(name)
+        return {
+            field: {value: tuple(names) for value, names in values.items()}
+            for field, values in indexes.items()
+        }
     
     def _create_character_profiles(self):
         """
@@ -584,8 +621,25 @@ class CharacterDatabase:
     
     def get_characters_by_game(self, game):
         """Get all characters from a specific game."""
+        return self.get_characters_by_field('game', game)
+    
+    def get_character_names_by_field(self, field, value):
+        """Get the names (in catalog order) of characters whose field matches."""
+        return self._indexes[field].get(value, ())
+    
+    def get_characters_by_field(self, field, value):
+        """
+        Get all characters with a given indexed field value.
+        
+        Args:
+            field: One of INDEXED_FIELDS ('game', 'energy_level', 'tempo')
+            value: Value to look up
+            
+        Returns:
+            Dictionary of matching characters
+        """
         return {
-            name: char for name, char in self.characters.items()
-            if char['game'] == game
+            name: self.characters[name]
+            for name in self.get_character_names_by_field(field, value)
         }
 
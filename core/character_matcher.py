@@ -4,138 +4,274 @@ Matches voice features to Supercell characters.
 """
 import numpy as np
 from character_database import CharacterDatabase
+from catalog_store import ENERGY_CODES, TEMPO_CODES
+from voice_embedding import (
+    embed_features, profile_features, distance_to_score, VoiceIndex
+)
+
+# Similarity between two 3-level categories indexed by their codes:
+# identical = 100, one side 'moderate' = 60, opposite extremes = 30
+CATEGORY_SIMILARITY = np.array([
+    [100, 60, 30],
+    [60, 100, 60],
+    [30, 60, 100],
+], dtype=np.float64)
+
+# Weighted average (pitch is most important)
+PITCH_WEIGHT = 0.5
+ENERGY_WEIGHT = 0.3
+TEMPO_WEIGHT = 0.2
 
 
 class CharacterMatcher:
     """Matches voice characteristics to Supercell game characters."""
     
-    def __init__(self):
-        """Initialize the character matcher."""
-        self.db = CharacterDatabase()
+    def __init__(self, catalog_path=None, match_mode='profile'):
+        """
+        Initialize the character matcher.
+        
+        Args:
+            catalog_path: Optional external catalog file (see catalog_store)
+            match_mode: 'profile' (weighted pitch/energy/tempo score over the
+                whole catalog) or 'embedding' (nearest neighbours of the
+                full feature embedding via a KD-tree)
+        """
+        if match_mode not in ('profile', 'embedding'):
+            raise ValueError(f"Unknown match mode '{match_mode}'")
+        self.match_mode = match_mode
+        
+        db = CharacterDatabase(catalog_path)
+        # Database and compiled tables are swapped together as one tuple so
+        # a concurrent reload never mixes old and new catalogs
+        self._state = (db, self._compile_profiles(db))
+    
+    @property
+    def db(self):
+        """The character database currently used for matching."""
+        return self._state[0]
     
-    def _calculate_pitch_similarity(self, user_pitch, character_pitch_range):
+    def reload(self, catalog_path=None):
         """
-        Calculate how similar the user's pitch is to a character's pitch range.
+        Load a new catalog version and atomically swap it in.
         
         Args:
-            user_pitch: User's mean pitch
-            character_pitch_range: Tuple of (min, max) pitch for character
+            catalog_path: Catalog file to load (default: the current one)
             
         Returns:
-            Similarity score (0-100)
+            The newly loaded CharacterDatabase
+        """
+        db = CharacterDatabase(catalog_path or self.db.catalog_path)
+        self._state = (db, self._compile_profiles(db))
+        return db
+    
+    def _compile_profiles(self, db):
+        """
+        Compile the character database into flat NumPy arrays.
+        
+        Scoring then runs as a handful of vectorized expressions over the
+        whole catalog instead of a Python loop over character dicts. An
+        external catalog's memory-mapped columns are used as-is, so worker
+        processes share those pages.
+        
+        Returns:
+            Dictionary of parallel arrays ('names', 'pitch_mid',
+            'energy_code', 'tempo_code')
         """
-        min_pitch, max_pitch = character_pitch_range
-        mid_pitch = (min_pitch + max_pitch) / 2
+        characters = db.get_all_characters()
+        names = list(characters)
+        profiles = [characters[name]['voice_profile'] for name in names]
         
+        if db.columns is not None:
+            compiled = {
+                'names': names,
+                'pitch_mid': db.columns['pitch_mid'],
+                'energy_code': db.columns['energy_code'],
+                'tempo_code': db.columns['tempo_code'],
+            }
+        else:
+            compiled = self._compile_profile_arrays(names, profiles)
+        
+        if self.match_mode == 'embedding':
+            embeddings = np.array(
+                [embed_features(profile_features(p)) for p in profiles]
+            ).reshape(len(profiles), -1)
+            compiled['index'] = VoiceIndex(embeddings)
+        
+        return compiled
+    
+    def _compile_profile_arrays(self, names, profiles):
+        """Build the scoring arrays from in-memory voice profile dicts."""
+        return {
+            'names': names,
+            'pitch_mid': np.array(
+                [(p['pitch_range'][0] + p['pitch_range'][1]) / 2 for p in profiles],
+                dtype=np.float64
+            ),
+            'energy_code': np.array(
+                [ENERGY_CODES[p['energy_level']] for p in profiles], dtype=np.intp
+            ),
+            'tempo_code': np.array(
+                [TEMPO_CODES[p['tempo']] for p in profiles], dtype=np.intp
+            ),
+        }
+    
+    def _calculate_pitch_similarity(self, user_pitch, character_pitch_mids):
+        """
+        Calculate how similar the user's pitch is to each character's pitch range.
+        
+        Args:
+            user_pitch: User's mean pitch
+            character_pitch_mids: Array of character pitch range midpoints
+        
+        Returns:
+            Array of similarity scores (0-100)
+        """
         # Calculate distance from character's typical pitch
-        distance = abs(user_pitch - mid_pitch)
+        distance = np.abs(user_pitch - character_pitch_mids)
         
         # Normalize to 0-100 scale (closer = higher score)
         # Maximum expected distance is about 150 Hz
         max_distance = 150
-        similarity = max(0, 100 - (distance / max_distance * 100))
-        
-        return similarity
+        return np.maximum(0, 100 - (distance / max_distance * 100))
     
-    def _calculate_energy_similarity(self, user_energy, character_energy):
+    def _calculate_energy_similarity(self, user_energy, character_energy_codes):
         """
         Calculate similarity in energy levels.
         
         Args:
             user_energy: User's energy category ('soft', 'moderate', 'loud')
-            character_energy: Character's energy level
-            
+            character_energy_codes: Array of character energy codes
+        
         Returns:
-            Similarity score (0-100)
+            Array of similarity scores (0-100)
         """
-        if user_energy == character_energy:
-            return 100
-        elif (user_energy == 'moderate' and character_energy in ['soft', 'loud']) or \
-             (character_energy == 'moderate' and user_energy in ['soft', 'loud']):
-            return 60
-        else:
-            return 30
+        return CATEGORY_SIMILARITY[ENERGY_CODES[user_energy]][character_energy_codes]
     
-    def _calculate_tempo_similarity(self, user_tempo, character_tempo):
+    def _calculate_tempo_similarity(self, user_tempo, character_tempo_codes):
         """
         Calculate similarity in tempo/pace.
         
         Args:
             user_tempo: User's tempo category ('slow', 'moderate', 'fast')
-            character_tempo: Character's tempo
-            
+            character_tempo_codes: Array of character tempo codes
+        
         Returns:
-            Similarity score (0-100)
+            Array of similarity scores (0-100)
         """
-        if user_tempo == character_tempo:
-            return 100
-        elif (user_tempo == 'moderate' and character_tempo in ['slow', 'fast']) or \
-             (character_tempo == 'moderate' and user_tempo in ['slow', 'fast']):
-            return 60
-        else:
-            return 30
+        return CATEGORY_SIMILARITY[TEMPO_CODES[user_tempo]][character_tempo_codes]
     
-    def match_character(self, voice_features, voice_characteristics):
+    def _build_match(self, db, char_name, pitch_sim, energy_sim, tempo_sim, score):
+        """Build the result dict for a single matched character."""
+        char_data = db.get_character(char_name)
+        profile = char_data['voice_profile']
+        
+        return {
+            'character': char_name,
+            'game': char_data['game'],
+            'description': char_data['description'],
+            'personality': profile['personality'],
+            'emoji': char_data.get('emoji', '🎮'),
+            'ascii_art': char_data.get('ascii_art', ''),
+            'image_url': char_data.get('image_url', ''),
+            'score': float(score),
+            'breakdown': {
+                'pitch_match': round(float(pitch_sim), 2),
+                'energy_match': round(float(energy_sim), 2),
+                'tempo_match': round(float(tempo_sim), 2)
+            }
+        }
+    
+    def match_character(self, voice_features, voice_characteristics, top_n=None):
         """
-        Find the best matching Supercell character based on voice.
+        Find the best matching Supercell characters based on voice.
         
         Args:
             voice_features: Dictionary of extracted voice features
             voice_characteristics: Dictionary of voice characteristics
-            
+            top_n: Only build results for the N best characters (default: all)
+        
         Returns:
-            List of tuples (character_name, character_info, match_score)
+            List of match dicts sorted by score (highest first)
         """
-        matches = []
+        db, profiles = self._state
         
-        for char_name, char_data in self.db.get_all_characters().items():
-            profile = char_data['voice_profile']
-            
-            # Calculate individual similarities
-            pitch_sim = self._calculate_pitch_similarity(
-                voice_features['mean_pitch'],
-                profile['pitch_range']
-            )
-            
-            energy_sim = self._calculate_energy_similarity(
-                voice_characteristics['energy_category'],
-                profile['energy_level']
+        if self.match_mode == 'embedding':
+            return self._match_embedding(
+                db, profiles, voice_features, voice_characteristics, top_n
             )
-            
-            tempo_sim = self._calculate_tempo_similarity(
-                voice_characteristics['tempo_category'],
-                profile['tempo']
-            )
-            
-            # Weighted average (pitch is most important)
-            total_score = (
-                pitch_sim * 0.5 +
-                energy_sim * 0.3 +
-                tempo_sim * 0.2
+        
+        # Calculate individual similarities for the whole catalog at once
+        pitch_sim = self._calculate_pitch_similarity(
+            voice_features['mean_pitch'],
+            profiles['pitch_mid']
+        )
+        energy_sim = self._calculate_energy_similarity(
+            voice_characteristics['energy_category'],
+            profiles['energy_code']
+        )
+        tempo_sim = self._calculate_tempo_similarity(
+            voice_characteristics['tempo_category'],
+            profiles['tempo_code']
+        )
+        
+        scores = np.round(
+            pitch_sim * PITCH_WEIGHT +
+            energy_sim * ENERGY_WEIGHT +
+            tempo_sim * TEMPO_WEIGHT,
+            2
+        )
+        
+        # Select the top N without sorting the whole catalog. Every character
+        # tied with the N-th score stays a candidate so ties resolve in
+        # catalog order, exactly like a stable sort.
+        candidates = np.arange(len(scores))
+        if top_n is not None and top_n < len(scores):
+            if top_n <= 0:
+                return []
+            kth = np.argpartition(-scores, top_n - 1)[:top_n]
+            candidates = np.flatnonzero(scores >= scores[kth].min())
+        order = candidates[np.lexsort((candidates, -scores[candidates]))]
+        if top_n is not None:
+            order = order[:top_n]
+        
+        return [
+            self._build_match(
+                db, profiles['names'][i], pitch_sim[i], energy_sim[i], tempo_sim[i], scores[i]
             )
-            
-            match_info = {
-                'character': char_name,
-                'game': char_data['game'],
-                'description': char_data['description'],
-                'personality': profile['personality'],
-                'emoji': char_data.get('emoji', '🎮'),
-                'ascii_art': char_data.get('ascii_art', ''),
-                'image_url': char_data.get('image_url', ''),
-                'score': round(total_score, 2),
-                'breakdown': {
-                    'pitch_match': round(pitch_sim, 2),
-                    'energy_match': round(energy_sim, 2),
-                    'tempo_match': round(tempo_sim, 2)
-                }
-            }
-            
-            matches.append(match_info)
+            for i in order
+        ]
+    
+    def _match_embedding(self, db, profiles, voice_features, voice_characteristics, top_n):
+        """
+        Rank characters by distance between full-feature embeddings.
+        
+        Only the k nearest characters are visited (KD-tree query); the
+        per-attribute breakdown is computed for those winners alone.
+        """
+        index = profiles['index']
+        k = index.size if top_n is None else top_n
+        distances, order = index.query(embed_features(voice_features), k)
         
-        # Sort by score (highest first)
-        matches.sort(key=lambda x: x['score'], reverse=True)
+        pitch_sim = self._calculate_pitch_similarity(
+            voice_features['mean_pitch'],
+            profiles['pitch_mid'][order]
+        )
+        energy_sim = self._calculate_energy_similarity(
+            voice_characteristics['energy_category'],
+            profiles['energy_code'][order]
+        )
+        tempo_sim = self._calculate_tempo_similarity(
+            voice_characteristics['tempo_category'],
+            profiles['tempo_code'][order]
+        )
+        scores = np.round(distance_to_score(distances), 2)
         
-        return matches
+        return [
+            self._build_match(
+                db, profiles['names'][i], pitch_sim[j], energy_sim[j], tempo_sim[j], scores[j]
+            )
+            for j, i in enumerate(order)
+        ]
     
     def get_top_matches(self, voice_features, voice_characteristics, top_n=5):
         """
@@ -145,10 +281,8 @@ class CharacterMatcher:
             voice_features: Dictionary of extracted voice features
             voice_characteristics: Dictionary of voice characteristics
             top_n: Number of top matches to return
-            
+        
         Returns:
             List of top N matches
         """
-        all_matches = self.match_character(voice_features, voice_characteristics)
-        return all_matches[:top_n]
-
+        return self.match_character(voice_features, voice_characteristics, top_n=top_n)
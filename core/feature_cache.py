@@ -0,0 +1,292 @@
+"""
+Feature Cache Module
+Content-addressed cache for voice analysis results.
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def _to_json(value):
+    """json.dumps fallback for the NumPy scalars and arrays in feature dicts."""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _encode(value):
+    return json.dumps(value, default=_to_json, separators=(',', ':')).encode('utf-8')
+
+
+class FeatureCache:
+    """
+    LRU + TTL cache of (features, characteristics) keyed by audio content.
+    
+    Entries live in memory, bounded by count and by serialized size. An
+    optional on-disk tier lets several worker processes share results; it
+    has its own count and size bounds, enforced (oldest files first, along
+    with expired ones) at most every disk_prune_interval seconds. Disk
+    entries are plain JSON, so a writable cache directory can never be used
+    to run code in the workers that read it.
+    """
+    
+    def __init__(self, max_entries=1024, max_bytes=16 * 1024 * 1024, ttl=3600,
+                 disk_dir=None, namespace='', disk_max_entries=16384,
+                 disk_max_bytes=256 * 1024 * 1024, disk_prune_interval=30):
+        """
+        Initialize the feature cache.
+        
+        Args:
+            max_entries: Maximum entries kept in memory (0 disables caching)
+            max_bytes: Maximum total serialized size of in-memory entries
+            ttl: Seconds an entry stays valid (0 = never expires)
+            disk_dir: Optional directory for the shared on-disk tier
+            namespace: Analyzer configuration string mixed into every key
+                so results from different settings never collide
+            disk_max_entries: Maximum files kept in the disk tier (0 = no limit)
+            disk_max_bytes: Maximum total size of the disk tier (0 = no limit)
+            disk_prune_interval: Minimum seconds between two prunes of the
+                disk tier by this process (checked when writing)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.namespace = namespace.encode('utf-8')
+        self.disk_max_entries = disk_max_entries
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_prune_interval = disk_prune_interval
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+        
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'disk_evictions': 0,
+        }
+        
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+    
+    @property
+    def enabled(self):
+        """Whether the cache stores anything at all."""
+        return self.max_entries > 0
+    
+    def key_for(self, audio_bytes, variant=''):
+        """
+        Content hash identifying an uploaded audio blob.
+        
+        Args:
+            audio_bytes: Uploaded bytes
+            variant: How the bytes are interpreted (e.g. raw PCM format and
+                rate), so identical bytes with different meanings differ
+        
+        Returns:
+            Hex digest, or None when the cache is disabled (nothing is hashed)
+        """
+        if not self.enabled:
+            return None
+        digest = hashlib.sha256(self.namespace)
+        digest.update(variant.encode('utf-8') + b'\0')
+        digest.update(audio_bytes)
+        return digest.hexdigest()
+    
+    def _expiry(self, now):
+        """Expiry timestamp for an entry stored at `now`."""
+        return now + self.ttl if self.ttl > 0 else float('inf')
+    
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f'{key}.json')
+    
+    def get(self, key):
+        """
+        Look up a cached analysis result.
+        
+        Args:
+            key: Key from key_for()
+        
+        Returns:
+            Cached value, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, size, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return value
+                del self._entries[key]
+                self._bytes -= size
+                self.stats['expirations'] += 1
+        
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['disk_hits'] += 1
+        value, size = entry
+        self._store_memory(key, value, size, now)
+        return value
+    
+    def put(self, key, value):
+        """
+        Store an analysis result.
+        
+        Args:
+            key: Key from key_for()
+            value: JSON-serializable result, e.g. (features, characteristics);
+                NumPy values are stored as plain numbers and lists, which is
+                what a disk hit returns (tuples come back as lists)
+        """
+        if not self.enabled:
+            return
+        
+        now = time.time()
+        payload = _encode(value)
+        self._store_memory(key, value, len(payload), now)
+        self._write_disk(key, payload)
+    
+    def _store_memory(self, key, value, size, now):
+        """Insert into the in-memory LRU and evict down to the bounds."""
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (self._expiry(now), size, value)
+            self._bytes += size
+            
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats['evictions'] += 1
+    
+    def _read_disk(self, key, now):
+        """Load a fresh entry and its size from the shared disk tier, if any."""
+        if not self.disk_dir:
+            return None
+        
+        path = self._disk_path(key)
+        try:
+            if self.ttl > 0 and os.path.getmtime(path) + self.ttl <= now:
+                os.unlink(path)
+                return None
+            with open(path, 'rb') as f:
+                payload = f.read()
+            return json.loads(payload), len(payload)
+        except (OSError, ValueError):
+            return None
+    
+    def _write_disk(self, key, payload):
+        """Atomically publish an entry to the shared disk tier."""
+        if not self.disk_dir:
+            return
+        
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(temp_path, self._disk_path(key))
+        except OSError:
+            # The disk tier is best-effort; memory still has the entry
+            if temp_path and os.path.exists(temp_path):
+                os.unlink(temp_path)
+        
+        if time.time() - self._last_prune >= self.disk_prune_interval:
+            self.prune_disk()
+    
+    def prune_disk(self):
+        """
+        Enforce the disk tier's TTL and bounds.
+        
+        Deletes expired entries and leftover temp files first, then the
+        oldest entries until the count and size bounds hold. Safe to run
+        from several processes at once.
+        
+        Returns:
+            Number of files deleted
+        """
+        if not self.disk_dir or not self._prune_lock.acquire(blocking=False):
+            return 0
+        try:
+            now = time.time()
+            self._last_prune = now
+            entries, doomed = [], []
+            try:
+                with os.scandir(self.disk_dir) as scan:
+                    for entry in scan:
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        if entry.name.endswith('.tmp'):
+                            # Abandoned by a writer that died mid-write
+                            if stat.st_mtime + max(self.disk_prune_interval, 60) <= now:
+                                doomed.append(entry.path)
+                        elif entry.name.endswith('.json'):
+                            if self.ttl > 0 and stat.st_mtime + self.ttl <= now:
+                                doomed.append(entry.path)
+                            else:
+                                entries.append((stat.st_mtime, stat.st_size, entry.path))
+            except OSError:
+                return 0
+            
+            entries.sort()
+            total_bytes = sum(size for _, size, _ in entries)
+            excess = 0
+            while ((self.disk_max_entries and len(entries) - excess > self.disk_max_entries)
+                   or (self.disk_max_bytes and total_bytes > self.disk_max_bytes)):
+                total_bytes -= entries[excess][1]
+                excess += 1
+            doomed.extend(path for _, _, path in entries[:excess])
+            
+            removed = 0
+            for path in doomed:
+                try:
+                    os.unlink(path)
+                    removed += 1
+                except OSError:
+                    # Already removed by another process
+                    pass
+            with self._lock:
+                self.stats['disk_evictions'] += removed
+            return removed
+        finally:
+            self._prune_lock.release()
+    
+    def snapshot(self):
+        """Counters and occupancy for monitoring."""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['disk_hits'] + self.stats['misses']
+            return dict(
+                self.stats,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+                hit_ratio=(
+                    (self.stats['hits'] + self.stats['disk_hits']) / lookups
+                    if lookups else 0.0
+                ),
+            )
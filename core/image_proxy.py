@@ -0,0 +1,288 @@
+"""
+Image Proxy Module
+Fetches and caches character images with single-flight deduplication.
+"""
+import os
+import hashlib
+import tempfile
+import threading
+import http.client
+from collections import OrderedDict, namedtuple
+from urllib.parse import urlsplit, urljoin
+
+
+CachedImage = namedtuple('CachedImage', ['data', 'etag', 'mimetype'])
+
+
+class ImageFetchError(RuntimeError):
+    """Raised when an image cannot be fetched from its upstream URL."""
+
+
+# Raised by a pooled keep-alive connection the upstream has already closed,
+# before any response bytes arrive (RemoteDisconnected is a ConnectionResetError)
+_STALE_CONNECTION_ERRORS = (ConnectionResetError, BrokenPipeError, ConnectionAbortedError)
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP(S) connections reused per upstream host."""
+    
+    def __init__(self, timeout, max_idle_per_host):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._idle = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, scheme, netloc, fresh=False):
+        """
+        Take an idle connection to the host or open a new one.
+        
+        Args:
+            scheme: 'http' or 'https'
+            netloc: Upstream host[:port]
+            fresh: Always open a new connection
+        
+        Returns:
+            Tuple of (connection, reused)
+        """
+        if not fresh:
+            with self._lock:
+                idle = self._idle.get((scheme, netloc))
+                if idle:
+                    return idle.pop(), True
+        
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout), False
+        if scheme == 'http':
+            return http.client.HTTPConnection(netloc, timeout=self.timeout), False
+        raise ImageFetchError(f"Unsupported URL scheme '{scheme}'")
+    
+    def discard(self, scheme, netloc):
+        """Close every idle connection to a host (they are likely stale too)."""
+        with self._lock:
+            idle = self._idle.pop((scheme, netloc), [])
+        for connection in idle:
+            connection.close()
+    
+    def release(self, scheme, netloc, connection):
+        """Return a reusable connection to the pool."""
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+
+class ImageProxy:
+    """
+    Serves character images from memory, disk or the upstream URL.
+    
+    Concurrent requests for the same uncached image share one upstream
+    fetch (single-flight), fetches use bounded timeouts over pooled
+    connections, files are written atomically and hot images are kept in a
+    small in-memory LRU.
+    """
+    
+    def __init__(self, cache_dir, timeout=5.0, max_concurrent_fetches=4,
+                 max_memory_bytes=8 * 1024 * 1024, max_image_bytes=5 * 1024 * 1024,
+                 max_redirects=3):
+        """
+        Initialize the image proxy.
+        
+        Args:
+            cache_dir: Directory where downloaded images are stored
+            timeout: Socket timeout in seconds for upstream connections
+            max_concurrent_fetches: Upstream fetches allowed at once; further
+                cold requests wait at most `timeout` for a slot
+            max_memory_bytes: Size bound of the in-memory image cache
+            max_image_bytes: Largest image accepted from upstream
+            max_redirects: Redirects followed per fetch
+        """
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.max_memory_bytes = max_memory_bytes
+        self.max_image_bytes = max_image_bytes
+        self.max_redirects = max_redirects
+        
+        self._pool = _ConnectionPool(timeout, max_idle_per_host=max_concurrent_fetches)
+        self._fetch_slots = threading.BoundedSemaphore(max_concurrent_fetches)
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+        
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def cache_path(self, name, image_url):
+        """Local file path for a character image."""
+        ext = '.webp' if '.webp' in image_url else '.png'
+        return os.path.join(self.cache_dir, f"{name.replace(' ', '_')}{ext}")
+    
+    def get(self, name, image_url):
+        """
+        Get an image, fetching it from upstream at most once.
+        
+        Args:
+            name: Character name (used for the cache file name)
+            image_url: Upstream image URL
+        
+        Returns:
+            CachedImage(data, etag, mimetype)
+        """
+        path = self.cache_path(name, image_url)
+        
+        with self._lock:
+            image = self._memory.get(path)
+            if image is not None:
+                self._memory.move_to_end(path)
+                return image
+            
+            # Single-flight: the first caller loads, the others wait for it
+            flight = self._inflight.get(path)
+            leader = flight is None
+            if leader:
+                flight = {'done': threading.Event(), 'image': None, 'error': None}
+                self._inflight[path] = flight
+        
+        if not leader:
+            if not flight['done'].wait(self.timeout * (self.max_redirects + 2)):
+                raise ImageFetchError(f"Timed out waiting for image '{name}'")
+            if flight['error'] is not None:
+                raise flight['error']
+            return flight['image']
+        
+        try:
+            flight['image'] = self._load(path, image_url)
+            self._remember(path, flight['image'])
+            return flight['image']
+        except Exception as e:
+            flight['error'] = e if isinstance(e, ImageFetchError) else ImageFetchError(str(e))
+            raise flight['error']
+        finally:
+            with self._lock:
+                self._inflight.pop(path, None)
+            flight['done'].set()
+    
+    def lookup(self, path):
+        """Image from the in-memory cache, or None."""
+        with self._lock:
+            image = self._memory.get(path)
+            if image is not None:
+                self._memory.move_to_end(path)
+            return image
+    
+    def load_file(self, path):
+        """Read a cached image file and keep it in memory."""
+        image = self._read(path)
+        self._remember(path, image)
+        return image
+    
+    def store(self, path, data):
+        """Write downloaded image bytes to the cache and keep them in memory."""
+        self._write_atomic(path, data)
+        return self.load_file(path)
+    
+    def _load(self, path, image_url):
+        """Read the image from disk, downloading it first if necessary."""
+        if not os.path.exists(path):
+            self._write_atomic(path, self._download(image_url))
+        return self._read(path)
+    
+    def _read(self, path):
+        """Read an image file into a CachedImage."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        
+        ext = os.path.splitext(path)[1]
+        return CachedImage(
+            data=data,
+            etag=hashlib.sha1(data).hexdigest(),
+            mimetype=f'image/{ext[1:]}'
+        )
+    
+    def _download(self, url):
+        """Fetch image bytes over a pooled connection, following redirects."""
+        if not self._fetch_slots.acquire(timeout=self.timeout):
+            raise ImageFetchError("Too many concurrent image downloads")
+        try:
+            for _ in range(self.max_redirects + 1):
+                status, location, body = self._request(url)
+                if status in (301, 302, 303, 307, 308) and location:
+                    url = urljoin(url, location)
+                    continue
+                if status != 200:
+                    raise ImageFetchError(f"Upstream returned HTTP {status}")
+                return body
+            raise ImageFetchError("Too many redirects")
+        finally:
+            self._fetch_slots.release()
+    
+    def _request(self, url):
+        """Issue one GET and return (status, location, body)."""
+        parts = urlsplit(url)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        
+        for attempt in range(2):
+            connection, reused = self._pool.acquire(parts.scheme, parts.netloc, fresh=attempt > 0)
+            try:
+                connection.request('GET', target, headers={
+                    'User-Agent': 'VoiceCharacterMatcher/1.0',
+                    'Accept': 'image/*'
+                })
+                response = connection.getresponse()
+                break
+            except _STALE_CONNECTION_ERRORS as e:
+                connection.close()
+                # The upstream closed this idle keep-alive connection: retry
+                # once on a new one; a new connection failing is a real error
+                if not reused:
+                    raise ImageFetchError(f"Image download failed: {e}")
+                self._pool.discard(parts.scheme, parts.netloc)
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise ImageFetchError(f"Image download failed: {e}")
+        
+        try:
+            body = response.read(self.max_image_bytes + 1)
+        except (OSError, http.client.HTTPException) as e:
+            connection.close()
+            raise ImageFetchError(f"Image download failed: {e}")
+        
+        if len(body) > self.max_image_bytes:
+            connection.close()
+            raise ImageFetchError("Image exceeds the maximum allowed size")
+        
+        if response.will_close or not response.isclosed():
+            connection.close()
+        else:
+            self._pool.release(parts.scheme, parts.netloc, connection)
+        return response.status, response.getheader('Location'), body
+    
+    def _write_atomic(self, path, data):
+        """Write a file so readers never observe a partial image."""
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+    
+    def _remember(self, path, image):
+        """Keep a hot image in the bounded in-memory LRU."""
+        size = len(image.data)
+        if size > self.max_memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(path, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous.data)
+            self._memory[path] = image
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted.data)
@@ -0,0 +1,252 @@
+"""
+Metrics Module
+In-process counters, gauges and latency histograms with Prometheus text export.
+"""
+import os
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+
+# Latency buckets (seconds) spanning cache hits to long decodes
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+@contextmanager
+def stage_timer(timings, stage):
+    """
+    Add the elapsed seconds of a block to timings[stage].
+    
+    Args:
+        timings: Dictionary collecting stage durations, or None to skip
+        stage: Stage name
+    """
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def _format_value(value):
+    """Render a sample value the way Prometheus expects."""
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    """Render a {name="value",...} label set (empty string if no labels)."""
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ''
+    rendered = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        )
+        for name, value in pairs
+    )
+    return '{' + rendered + '}'
+
+
+class _Metric:
+    """Base class for a metric family with optional labels."""
+    
+    kind = 'untyped'
+    
+    def __init__(self, name, documentation, labelnames=()):
+        """
+        Initialize the metric family.
+        
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Names of the labels every sample carries
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels):
+        """Label values in labelnames order."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def render(self, extra=()):
+        """
+        Prometheus text exposition lines for this family.
+        
+        Args:
+            extra: (name, value) label pairs added to every sample
+        """
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value, extra))
+        return lines
+    
+    def _render_sample(self, key, value, extra):
+        return [f'{self.name}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}']
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    
+    kind = 'counter'
+    
+    def inc(self, amount=1, **labels):
+        """Add amount (must be non-negative) to the labelled counter."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (e.g. requests in flight)."""
+    
+    kind = 'gauge'
+    
+    def inc(self, amount=1, **labels):
+        """Increase the labelled gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def dec(self, amount=1, **labels):
+        """Decrease the labelled gauge."""
+        self.inc(-amount, **labels)
+    
+    def set(self, value, **labels):
+        """Set the labelled gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    @contextmanager
+    def track_inprogress(self, **labels):
+        """Hold the gauge one higher while the block runs."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+        
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Names of the labels every sample carries
+            buckets: Increasing upper bounds; +Inf is appended automatically
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+    
+    def observe(self, value, **labels):
+        """Record one observation."""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+    
+    @contextmanager
+    def time(self, **labels):
+        """Observe the elapsed seconds of a block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def _render_sample(self, key, state, extra):
+        counts, total, count = state
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _format_labels(
+                self.labelnames, key, list(extra) + [('le', _format_value(bound))]
+            )
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labelnames, key, extra)
+        lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+        lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together on /metrics."""
+    
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+    
+    def __init__(self, process_label=None):
+        """
+        Initialize the registry.
+        
+        Args:
+            process_label: Optional label name (e.g. 'pid') carrying the
+                process ID on every sample. Each process counts on its own,
+                so with several workers the label keeps their series apart:
+                otherwise a scrape answered by another worker would look
+                like a counter reset to rate().
+        """
+        self.process_label = process_label
+        self._metrics = []
+    
+    def register(self, metric):
+        """Add a metric family and return it."""
+        self._metrics.append(metric)
+        return metric
+    
+    def counter(self, name, documentation, labelnames=()):
+        """Create and register a Counter."""
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name, documentation, labelnames=()):
+        """Create and register a Gauge."""
+        return self.register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Create and register a Histogram."""
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+    
+    def render(self):
+        """Prometheus text exposition (format 0.0.4) of every family."""
+        # Read at render time: the registry is created before gunicorn forks
+        extra = [(self.process_label, os.getpid())] if self.process_label else []
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render(extra))
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,124 @@
+"""
+Request Profiler Module
+Opt-in cProfile capture of individual requests with bounded on-disk retention.
+"""
+import os
+import io
+import json
+import time
+import uuid
+import random
+import pstats
+import cProfile
+import threading
+
+
+class RequestProfiler:
+    """
+    Runs selected requests under cProfile and keeps the newest captures.
+    
+    Each capture is a pair of files sharing an id: '<id>.prof' (pstats
+    data, open with snakeviz or pstats) and '<id>.json' (request metadata,
+    audio duration, stage breakdown and the top functions by cumulative
+    time). Only one request is profiled at a time; others run normally.
+    """
+    
+    def __init__(self, directory, sample_rate=0.0, header='X-Profile', max_files=50,
+                 top_functions=30):
+        """
+        Initialize the profiler.
+        
+        Args:
+            directory: Where captures are written (created if missing)
+            sample_rate: Fraction of requests profiled without being asked
+            header: Request header that asks for a profile (value '1')
+            max_files: Captures kept; the oldest are deleted beyond this
+            top_functions: Functions listed in each capture's summary
+        """
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.header = header
+        self.max_files = max_files
+        self.top_functions = top_functions
+        self._busy = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    def should_profile(self, headers):
+        """Whether a request (given its headers) should be profiled."""
+        if self.header and headers.get(self.header) == '1':
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+    
+    def profile(self, function, *args, **kwargs):
+        """
+        Call function under cProfile.
+        
+        Returns:
+            Tuple of (result, profile); profile is None when another
+            request was already being profiled and this one ran unprofiled
+        """
+        if not self._busy.acquire(blocking=False):
+            return function(*args, **kwargs), None
+        try:
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                profile.disable()
+            return result, profile
+        finally:
+            self._busy.release()
+    
+    def _summary(self, profile):
+        """Top functions by cumulative time, as JSON-friendly rows."""
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        rows = []
+        for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+            rows.append({
+                'function': f'{os.path.basename(filename)}:{line}({name})',
+                'calls': calls,
+                'total_seconds': total,
+                'cumulative_seconds': cumulative,
+            })
+        rows.sort(key=lambda row: row['cumulative_seconds'], reverse=True)
+        return rows[:self.top_functions]
+    
+    def save(self, profile, metadata):
+        """
+        Write a capture and enforce the retention limit.
+        
+        Args:
+            profile: cProfile.Profile returned by profile()
+            metadata: JSON-serializable request details
+        
+        Returns:
+            Capture id
+        """
+        now = time.time()
+        capture_id = '{}{:03d}-{}'.format(
+            time.strftime('%Y%m%dT%H%M%S', time.gmtime(now)),
+            int(now % 1 * 1000),
+            uuid.uuid4().hex[:8]
+        )
+        base = os.path.join(self.directory, capture_id)
+        
+        profile.dump_stats(base + '.prof')
+        record = dict(metadata, id=capture_id, top_functions=self._summary(profile))
+        with open(base + '.json', 'w') as f:
+            json.dump(record, f, indent=2, default=float)
+        
+        self._prune()
+        return capture_id
+    
+    def _prune(self):
+        """Delete the oldest captures beyond max_files (ids sort by time)."""
+        captures = sorted(
+            name[:-len('.json')] for name in os.listdir(self.directory) if name.endswith('.json')
+        )
+        for capture_id in captures[:max(len(captures) - self.max_files, 0)]:
+            for suffix in ('.json', '.prof'):
+                try:
+                    os.unlink(os.path.join(self.directory, capture_id + suffix))
+                except FileNotFoundError:
+                    pass
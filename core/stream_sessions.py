@@ -0,0 +1,134 @@
+"""
+Stream Sessions Module
+Tracks in-progress chunked uploads that are decoded and analyzed as they arrive.
+"""
+import time
+import uuid
+import threading
+from streaming_features import StreamingFeatureExtractor
+
+
+class StreamCapacityError(RuntimeError):
+    """Raised when no more concurrent stream sessions can be opened."""
+
+
+class StreamSession:
+    """One recording being uploaded chunk by chunk."""
+    
+    def __init__(self, analyzer, decoder):
+        """
+        Start the incremental decoder and feature extractor.
+        
+        Args:
+            analyzer: VoiceAnalyzer used for frame features
+            decoder: AudioDecoder used to open the ffmpeg stream (its
+                max_duration caps the analyzed samples)
+        """
+        self.id = uuid.uuid4().hex
+        max_samples = None
+        if decoder.max_duration:
+            max_samples = int(decoder.max_duration * decoder.sample_rate)
+        self.extractor = StreamingFeatureExtractor(analyzer, max_samples=max_samples)
+        self.stream = decoder.open_stream(self.extractor.push)
+        self.bytes_received = 0
+        self.last_activity = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def add_chunk(self, chunk):
+        """Feed the next encoded chunk (chunks are applied in arrival order)."""
+        with self._lock:
+            # Past the duration limit chunks are counted but not decoded
+            if not self.extractor.full:
+                self.stream.write(chunk)
+            self.bytes_received += len(chunk)
+            self.last_activity = time.monotonic()
+    
+    def finish(self):
+        """
+        Wait for the decoder to drain and aggregate the features.
+        
+        Returns:
+            Dictionary of voice features
+        """
+        with self._lock:
+            self.stream.close()
+            return self.extractor.finish()
+    
+    def abort(self):
+        """Discard the session and stop its decoder."""
+        self.stream.abort()
+
+
+class StreamSessionManager:
+    """
+    Bounded registry of open stream sessions with idle expiry.
+    
+    While any session is open a reaper thread aborts the idle ones, so a
+    client that never finishes or cancels doesn't keep its ffmpeg process
+    running until the next session is opened.
+    """
+    
+    def __init__(self, analyzer, decoder, max_sessions=32, idle_timeout=60):
+        """
+        Initialize the session manager.
+        
+        Args:
+            analyzer: VoiceAnalyzer for new sessions
+            decoder: AudioDecoder for new sessions
+            max_sessions: Maximum concurrently open sessions
+            idle_timeout: Seconds without a chunk before a session is dropped
+        """
+        self.analyzer = analyzer
+        self.decoder = decoder
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+    
+    def _expire_idle(self):
+        """Abort sessions whose client went away (call with the lock held)."""
+        cutoff = time.monotonic() - self.idle_timeout
+        for session_id, session in list(self._sessions.items()):
+            if session.last_activity < cutoff:
+                del self._sessions[session_id]
+                session.abort()
+    
+    def _start_reaper(self):
+        """Start the reaper thread unless it is running (call with the lock held)."""
+        # Started on demand: threads don't survive gunicorn's fork of a preloaded app
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(target=self._reap, daemon=True)
+            self._reaper.start()
+    
+    def _reap(self):
+        """Expire idle sessions periodically until none are left open."""
+        while True:
+            time.sleep(max(self.idle_timeout / 4, 0.05))
+            with self._lock:
+                self._expire_idle()
+                if not self._sessions:
+                    self._reaper = None
+                    return
+    
+    def create(self):
+        """Open a new session, or raise StreamCapacityError when full."""
+        with self._lock:
+            self._expire_idle()
+            if len(self._sessions) >= self.max_sessions:
+                raise StreamCapacityError("Too many open stream sessions")
+            session = StreamSession(self.analyzer, self.decoder)
+            self._sessions[session.id] = session
+            self._start_reaper()
+            return session
+    
+    def get(self, session_id):
+        """Look up an open session (None if unknown or expired)."""
+        with self._lock:
+            self._expire_idle()
+            return self._sessions.get(session_id)
+    
+    def pop(self, session_id):
+        """Remove and return a session (None if unknown or expired)."""
+        with self._lock:
+            return self._sessions.pop(session_id, None)
@@ -0,0 +1,236 @@
+"""
+Streaming Features Module
+Incremental frame-level feature extraction for audio that arrives in pieces.
+"""
+import threading
+import numpy as np
+import librosa
+from audio_decoder import InvalidAudioError
+
+
+# Encoded bytes written to ffmpeg at a time by extract_features_blockwise
+ENCODED_CHUNK_BYTES = 65536
+
+# Whole uploads don't need low latency, so they use larger blocks than live
+# streams: ~3 s at 44.1 kHz keeps per-block overhead small and memory flat
+BLOCKWISE_BLOCK_FRAMES = 256
+
+
+class StreamingFeatureExtractor:
+    """
+    Computes VoiceAnalyzer features block by block as samples arrive.
+    
+    Samples are framed on the same grid as the analyzer's centered STFT
+    (n_fft // 2 zeros are prepended, and appended on finish), each complete
+    block of frames is analyzed immediately, and only small per-frame
+    statistics are kept. finish() then just aggregates.
+    
+    Tempo always comes from the speaking-rate estimator here, since the beat
+    tracker needs the whole onset envelope at once.
+    """
+    
+    def __init__(self, analyzer, block_frames=64, max_samples=None):
+        """
+        Initialize the streaming extractor.
+        
+        Args:
+            analyzer: VoiceAnalyzer providing settings and feature stages
+            block_frames: Frames analyzed per block once enough samples
+                are buffered
+            max_samples: Samples analyzed at most; later samples are
+                dropped (default: no limit)
+        """
+        self.analyzer = analyzer
+        self.block_frames = block_frames
+        self.max_samples = max_samples
+        self.n_fft = analyzer.n_fft
+        self.hop_length = analyzer.hop_length
+        
+        self._buffer = np.zeros(self.n_fft // 2, dtype=np.float32)
+        self._lock = threading.Lock()
+        self._finished = False
+        self.samples_received = 0
+        self._has_signal = False
+        
+        # Running sums (float64) instead of full per-frame matrices
+        self._pitch = np.zeros(3)  # count, sum, sum of squares
+        self._centroid = np.zeros(2)  # count, sum
+        self._zcr = np.zeros(2)  # count, sum
+        self._mfcc = np.zeros(5)
+        self._mfcc_frames = 0
+        # Per-frame RMS (float32, 4 bytes per hop), the only per-frame state:
+        # the speaking-rate envelope needs it
+        self._rms = []
+    
+    @property
+    def full(self):
+        """True once max_samples have been received."""
+        return self.max_samples is not None and self.samples_received >= self.max_samples
+    
+    @property
+    def frames_processed(self):
+        """Number of analysis frames processed so far."""
+        return sum(len(block) for block in self._rms)
+    
+    def push(self, samples):
+        """
+        Add decoded mono float samples and analyze every complete block.
+        
+        Args:
+            samples: 1-D numpy array of samples at the analyzer's sample rate
+        """
+        if len(samples) == 0:
+            return
+        with self._lock:
+            if self._finished:
+                raise RuntimeError("Stream already finished")
+            if self.max_samples is not None:
+                samples = samples[:max(self.max_samples - self.samples_received, 0)]
+                if len(samples) == 0:
+                    return
+            self.samples_received += len(samples)
+            self._has_signal = self._has_signal or bool(np.any(samples != 0))
+            self._buffer = np.concatenate([self._buffer, samples.astype(np.float32)])
+            self._drain(min_frames=self.block_frames)
+    
+    def _drain(self, min_frames):
+        """Analyze as many whole frames as the buffer holds (at least min_frames)."""
+        available = 1 + (len(self._buffer) - self.n_fft) // self.hop_length
+        if len(self._buffer) < self.n_fft or available < min_frames:
+            return
+        
+        used = self.n_fft + (available - 1) * self.hop_length
+        self._process_block(self._buffer[:used])
+        # Keep the overlap the next frame still needs
+        self._buffer = self._buffer[available * self.hop_length:]
+    
+    def _process_block(self, block):
+        """Compute frame features for a block whose frames are all complete."""
+        analyzer = self.analyzer
+        sample_rate = analyzer.sample_rate
+        
+        magnitude = np.abs(librosa.stft(
+            block, n_fft=self.n_fft, hop_length=self.hop_length, center=False
+        ))
+        mel_power = librosa.feature.melspectrogram(S=magnitude ** 2, sr=sample_rate)
+        spectrogram = {
+            'magnitude': magnitude,
+            'mel_power': mel_power,
+            'log_mel': librosa.power_to_db(mel_power),
+            'center': False
+        }
+        
+        pitch_values = analyzer.pitch_estimator.estimate(
+            block, spectrogram, sample_rate, self.n_fft, self.hop_length
+        )
+        self._pitch += (
+            len(pitch_values), np.sum(pitch_values), np.sum(np.square(pitch_values, dtype=np.float64))
+        )
+        
+        frames = librosa.util.frame(block, frame_length=self.n_fft, hop_length=self.hop_length)
+        self._rms.append(
+            np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=0)).astype(np.float32)
+        )
+        
+        zcr = librosa.feature.zero_crossing_rate(
+            block, frame_length=self.n_fft, hop_length=self.hop_length, center=False
+        )[0]
+        self._zcr += (len(zcr), np.sum(zcr))
+        
+        centroid = librosa.feature.spectral_centroid(
+            S=magnitude, sr=sample_rate, n_fft=self.n_fft, hop_length=self.hop_length
+        )[0]
+        self._centroid += (len(centroid), np.sum(centroid))
+        
+        mfccs = librosa.feature.mfcc(S=spectrogram['log_mel'], n_mfcc=13)
+        self._mfcc += np.sum(mfccs[:5], axis=1)
+        self._mfcc_frames += mfccs.shape[1]
+    
+    def finish(self):
+        """
+        Flush the remaining samples and aggregate the feature dict.
+        
+        Returns:
+            Dictionary of voice features (same keys as extract_features)
+        """
+        with self._lock:
+            if self._finished:
+                raise RuntimeError("Stream already finished")
+            self._finished = True
+            
+            if self.samples_received == 0 or not self._has_signal:
+                raise InvalidAudioError("Audio data is empty or silent")
+            
+            self._buffer = np.concatenate(
+                [self._buffer, np.zeros(self.n_fft // 2, dtype=np.float32)]
+            )
+            self._drain(min_frames=1)
+            return self._aggregate()
+    
+    def _aggregate(self):
+        """Turn the running statistics into the feature dict."""
+        # Streams are analyzed as they arrive, so nothing is trimmed
+        duration = self.samples_received / self.analyzer.sample_rate
+        features = {'duration': duration, 'speech_duration': duration}
+        
+        count, total, total_sq = self._pitch
+        if count:
+            mean = total / count
+            features['mean_pitch'] = mean
+            features['pitch_variance'] = max(total_sq / count - mean ** 2, 0.0)
+        else:
+            features['mean_pitch'] = 150  # Default neutral pitch
+            features['pitch_variance'] = 100
+        
+        rms = np.concatenate(self._rms).astype(np.float64)
+        features['mean_energy'] = np.mean(rms)
+        features['energy_variance'] = np.var(rms)
+        self.analyzer._extract_speaking_rate(rms, features)
+        
+        features['spectral_centroid'] = self._centroid[1] / self._centroid[0]
+        features['zero_crossing_rate'] = self._zcr[1] / self._zcr[0]
+        for i in range(5):  # Use first 5 MFCCs
+            features[f'mfcc_{i}'] = self._mfcc[i] / self._mfcc_frames
+        
+        return features
+
+
+def extract_features_blockwise(analyzer, decoder, audio_bytes,
+                               block_frames=BLOCKWISE_BLOCK_FRAMES):
+    """
+    Decode and analyze an encoded recording one block at a time.
+    
+    The upload is fed to an ffmpeg pipe in small chunks and each decoded
+    block is analyzed as soon as it arrives, so neither the full signal nor
+    full-length spectrogram/pitch/MFCC matrices are ever held; peak memory
+    stays roughly constant however long the recording is.
+    
+    Args:
+        analyzer: VoiceAnalyzer providing settings and feature stages
+        decoder: AudioDecoder (its max_duration caps the analyzed samples)
+        audio_bytes: Encoded audio file contents
+        block_frames: Frames analyzed per block
+    
+    Returns:
+        Dictionary of voice features (same keys as extract_features)
+    """
+    if not audio_bytes:
+        raise ValueError("Audio data is empty")
+    
+    max_samples = None
+    if decoder.max_duration:
+        max_samples = int(decoder.max_duration * decoder.sample_rate)
+    extractor = StreamingFeatureExtractor(analyzer, block_frames, max_samples)
+    
+    stream = decoder.open_stream(extractor.push)
+    try:
+        view = memoryview(audio_bytes)
+        for offset in range(0, len(view), ENCODED_CHUNK_BYTES):
+            if extractor.full:
+                break
+            stream.write(view[offset:offset + ENCODED_CHUNK_BYTES])
+        stream.close()
+    except BaseException:
+        stream.abort()
+        raise
+    return extractor.finish()
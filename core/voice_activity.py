@@ -0,0 +1,97 @@
+"""
+Voice Activity Module
+Cheap energy/zero-crossing gate that trims silence before feature extraction.
+"""
+import numpy as np
+import librosa
+
+
+class VoiceActivityDetector:
+    """
+    Frame-level speech gate based on RMS energy and zero crossing rate.
+    
+    A frame counts as speech when its energy is within top_db of the loudest
+    frame and it is either voiced (low zero crossing rate) or loud enough to
+    be an unvoiced consonant. Speech regions are widened by a short padding
+    so word onsets and decays survive, and everything else is dropped.
+    """
+    
+    def __init__(self, top_db=35.0, max_zcr=0.25, loud_db=15.0, padding=0.1):
+        """
+        Initialize the detector.
+        
+        Args:
+            top_db: Frames quieter than the loudest frame by more than this
+                many dB are silence
+            max_zcr: Zero crossing rate above which a quiet frame is treated
+                as noise rather than voiced speech
+            loud_db: Frames within this many dB of the loudest frame are
+                speech regardless of zero crossing rate (fricatives)
+            padding: Seconds kept on each side of every speech region
+        """
+        self.top_db = top_db
+        self.max_zcr = max_zcr
+        self.loud_db = loud_db
+        self.padding = padding
+    
+    def speech_mask(self, audio_data, sample_rate, frame_length, hop_length):
+        """
+        Classify every analysis frame as speech or not.
+        
+        Args:
+            audio_data: Audio data as numpy array
+            sample_rate: Sample rate of the audio
+            frame_length: Samples per frame
+            hop_length: Number of samples between successive frames
+        
+        Returns:
+            Boolean numpy array with one entry per (centered) frame
+        """
+        rms = librosa.feature.rms(
+            y=audio_data, frame_length=frame_length, hop_length=hop_length
+        )[0]
+        zcr = librosa.feature.zero_crossing_rate(
+            audio_data, frame_length=frame_length, hop_length=hop_length
+        )[0]
+        
+        level_db = librosa.amplitude_to_db(rms, ref=np.max)
+        voiced = (level_db > -self.top_db) & (zcr <= self.max_zcr)
+        loud = level_db > -self.loud_db
+        mask = voiced | loud
+        
+        # Widen every speech region by the padding (binary dilation)
+        pad_frames = int(round(self.padding * sample_rate / hop_length))
+        if pad_frames > 0 and mask.any():
+            kernel = np.ones(2 * pad_frames + 1)
+            mask = np.convolve(mask.astype(float), kernel, mode='same') > 0
+        return mask
+    
+    def trim(self, audio_data, sample_rate, frame_length, hop_length):
+        """
+        Drop the non-speech regions of a recording.
+        
+        Args:
+            audio_data: Audio data as numpy array
+            sample_rate: Sample rate of the audio
+            frame_length: Samples per frame
+            hop_length: Number of samples between successive frames
+        
+        Returns:
+            The speech regions concatenated, or the input unchanged if no
+            frame was classified as speech
+        """
+        mask = self.speech_mask(audio_data, sample_rate, frame_length, hop_length)
+        if not mask.any() or mask.all():
+            return audio_data
+        
+        # Runs of speech frames as [first, last + 1) frame indices
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], mask.astype(np.int8), [0]])))
+        runs = edges.reshape(-1, 2)
+        
+        # Frame i is centered on sample i * hop, so it owns the hop-sized
+        # span around that sample; the last frame owns the rest of the clip
+        spans = runs * hop_length - hop_length // 2
+        spans[runs == len(mask)] = len(audio_data)
+        spans = np.clip(spans, 0, len(audio_data))
+        
+        return np.concatenate([audio_data[start:end] for start, end in spans])
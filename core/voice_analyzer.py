@@ -4,82 +4,240 @@ Extracts voice features for character matching.
 """
 import numpy as np
 import librosa
+from pitch_estimators import get_pitch_estimator
+from analysis_profiles import frame_settings
+from voice_activity import VoiceActivityDetector
+from metrics import stage_timer
+from audio_decoder import InvalidAudioError
+
+
+# Syllables per second -> tempo scale used by categorize_voice.
+# 3.3 syl/s (slow speech) maps to 80 and 5 syl/s (brisk speech) to 120.
+SYLLABLE_RATE_TO_TEMPO = 24.0
 
 
 class VoiceAnalyzer:
     """Analyzes voice recordings and extracts features."""
     
-    def __init__(self, sample_rate=44100):
+    def __init__(self, sample_rate=44100, n_fft=None, hop_length=None,
+                 pitch_backend='piptrack', tempo_method='speaking_rate', vad=None):
         """
         Initialize the voice analyzer.
         
         Args:
             sample_rate: Sample rate of the audio
+            n_fft: FFT window size shared by all spectral features
+                (default: ~46 ms at the given sample rate, 2048 at 44.1 kHz)
+            hop_length: Number of samples between successive frames
+                (default: ~11.6 ms at the given sample rate, 512 at 44.1 kHz)
+            pitch_backend: Pitch estimator name ('piptrack' or 'yin')
+                or a PitchEstimator instance
+            tempo_method: 'speaking_rate' (syllable rate from the energy
+                envelope) or 'beat_track' (librosa music beat tracker)
+            vad: Silence trimming before extraction: None/False (off),
+                True (default VoiceActivityDetector) or a detector instance
         """
         self.sample_rate = sample_rate
+        default_n_fft, default_hop = frame_settings(sample_rate)
+        self.n_fft = n_fft or default_n_fft
+        self.hop_length = hop_length or default_hop
+        self.pitch_estimator = get_pitch_estimator(pitch_backend)
+        if tempo_method not in ('speaking_rate', 'beat_track'):
+            raise ValueError(f"Unknown tempo method '{tempo_method}'")
+        self.tempo_method = tempo_method
+        if vad is True:
+            vad = VoiceActivityDetector()
+        self.vad = vad or None
     
-    def extract_features(self, audio_data):
+    def _compute_spectrogram(self, audio_data):
         """
-        Extract voice features from audio data.
+        Compute the spectral representations shared by every feature stage.
+        
+        The magnitude STFT is computed once and the mel spectrogram and its
+        log-power version are derived from it, so piptrack, the spectral
+        centroid, onset strength and the MFCCs no longer each run their own
+        STFT over the same signal.
         
         Args:
             audio_data: Audio data as numpy array
             
         Returns:
-            Dictionary of voice features
+            Dictionary with 'magnitude', 'mel_power' and 'log_mel' arrays
         """
-        # Ensure audio is not empty
-        if len(audio_data) == 0 or np.all(audio_data == 0):
-            raise ValueError("Audio data is empty or silent")
-        
-        features = {}
-        
-        # 1. Pitch (fundamental frequency)
-        pitches, magnitudes = librosa.piptrack(
-            y=audio_data,
-            sr=self.sample_rate,
-            fmin=50,
-            fmax=500
+        magnitude = np.abs(librosa.stft(
+            audio_data,
+            n_fft=self.n_fft,
+            hop_length=self.hop_length
+        ))
+        mel_power = librosa.feature.melspectrogram(
+            S=magnitude ** 2,
+            sr=self.sample_rate
         )
-        # Get the pitch with highest magnitude at each frame
-        pitch_values = []
-        for t in range(pitches.shape[1]):
-            index = magnitudes[:, t].argmax()
-            pitch = pitches[index, t]
-            if pitch > 0:
-                pitch_values.append(pitch)
-        
-        if pitch_values:
+        return {
+            'magnitude': magnitude,
+            'mel_power': mel_power,
+            'log_mel': librosa.power_to_db(mel_power)
+        }
+    
+    def _extract_pitch(self, audio_data, spectrogram, features):
+        """Estimate mean pitch and pitch variance with the configured backend."""
+        pitch_values = self.pitch_estimator.estimate(
+            audio_data,
+            spectrogram,
+            self.sample_rate,
+            self.n_fft,
+            self.hop_length
+        )
+        
+        if len(pitch_values):
             features['mean_pitch'] = np.mean(pitch_values)
             features['pitch_variance'] = np.var(pitch_values)
         else:
             features['mean_pitch'] = 150  # Default neutral pitch
             features['pitch_variance'] = 100
-        
-        # 2. Energy/Volume
-        rms = librosa.feature.rms(y=audio_data)[0]
+    
+    def _extract_energy(self, audio_data, features):
+        """Compute RMS energy statistics (time-domain, no STFT needed)."""
+        rms = librosa.feature.rms(
+            y=audio_data,
+            frame_length=self.n_fft,
+            hop_length=self.hop_length
+        )[0]
         features['mean_energy'] = np.mean(rms)
         features['energy_variance'] = np.var(rms)
-        
-        # 3. Tempo (speaking rate)
-        tempo, _ = librosa.beat.beat_track(y=audio_data, sr=self.sample_rate)
+        return rms
+    
+    def _extract_tempo(self, spectrogram, features):
+        """Estimate tempo from an onset envelope built on the shared log-mel."""
+        onset_envelope = librosa.onset.onset_strength(
+            S=spectrogram['log_mel'],
+            sr=self.sample_rate,
+            hop_length=self.hop_length,
+            aggregate=np.median
+        )
+        tempo, _ = librosa.beat.beat_track(
+            onset_envelope=onset_envelope,
+            sr=self.sample_rate,
+            hop_length=self.hop_length
+        )
         features['tempo'] = tempo
+    
+    def _extract_speaking_rate(self, rms, features):
+        """
+        Estimate speaking rate by counting syllable-like energy peaks.
         
-        # 4. Spectral characteristics
+        Each syllable shows up as a hump in the smoothed RMS envelope, so the
+        rate is the number of prominent peaks per second of active speech.
+        The rate is also reported as 'tempo' on the scale categorize_voice
+        expects, replacing the much more expensive beat tracker.
+        """
+        # scipy.signal costs ~1 s to import; only load it once it's needed
+        from scipy.signal import find_peaks
+        
+        frame_rate = self.sample_rate / self.hop_length
+        
+        # Smooth over ~50 ms so each syllable forms a single hump
+        width = max(1, int(round(0.05 * frame_rate)))
+        envelope = np.convolve(rms, np.ones(width) / width, mode='same')
+        peak_energy = envelope.max()
+        
+        speech_threshold = 0.1 * peak_energy
+        speech_seconds = np.count_nonzero(envelope > speech_threshold) / frame_rate
+        
+        # Syllables are at least ~100 ms apart
+        peaks, _ = find_peaks(
+            envelope,
+            height=speech_threshold,
+            distance=max(1, int(round(0.1 * frame_rate))),
+            prominence=0.05 * peak_energy
+        )
+        
+        speaking_rate = len(peaks) / speech_seconds if speech_seconds > 0 else 0.0
+        features['speaking_rate'] = speaking_rate
+        features['tempo'] = speaking_rate * SYLLABLE_RATE_TO_TEMPO
+    
+    def _extract_spectral_centroid(self, spectrogram, features):
+        """Compute the mean spectral centroid from the shared magnitude STFT."""
         spectral_centroids = librosa.feature.spectral_centroid(
-            y=audio_data,
-            sr=self.sample_rate
+            S=spectrogram['magnitude'],
+            sr=self.sample_rate,
+            n_fft=self.n_fft,
+            hop_length=self.hop_length
         )[0]
         features['spectral_centroid'] = np.mean(spectral_centroids)
+    
+    def _extract_zero_crossing_rate(self, audio_data, features):
+        """Compute the mean zero crossing rate (roughness/smoothness)."""
+        zcr = librosa.feature.zero_crossing_rate(
+            audio_data,
+            frame_length=self.n_fft,
+            hop_length=self.hop_length
+        )[0]
+        features['zero_crossing_rate'] = np.mean(zcr)
+    
+    def _extract_mfcc(self, spectrogram, features):
+        """Compute the first MFCC means from the shared log-mel spectrogram."""
+        mfccs = librosa.feature.mfcc(S=spectrogram['log_mel'], n_mfcc=13)
+        for i in range(5):  # Use first 5 MFCCs
+            features[f'mfcc_{i}'] = np.mean(mfccs[i])
+    
+    def extract_features(self, audio_data, stage_timings=None):
+        """
+        Extract voice features from audio data.
+        
+        Args:
+            audio_data: Audio data as numpy array
+            stage_timings: Optional dict that receives the seconds spent in
+                each stage ('vad', 'spectrogram', 'pitch', ...)
+            
+        Returns:
+            Dictionary of voice features, including 'duration' (seconds
+            received) and 'speech_duration' (seconds actually analyzed)
+        """
+        # Ensure audio is not empty
+        if len(audio_data) == 0 or np.all(audio_data == 0):
+            raise InvalidAudioError("Audio data is empty or silent")
+        
+        features = {'duration': len(audio_data) / self.sample_rate}
+        
+        # 0. Drop leading/trailing silence and pauses before the STFT stages
+        if self.vad is not None:
+            with stage_timer(stage_timings, 'vad'):
+                audio_data = self.vad.trim(
+                    audio_data, self.sample_rate, self.n_fft, self.hop_length
+                )
+        features['speech_duration'] = len(audio_data) / self.sample_rate
+        
+        with stage_timer(stage_timings, 'spectrogram'):
+            spectrogram = self._compute_spectrogram(audio_data)
+        
+        # 1. Pitch (fundamental frequency)
+        with stage_timer(stage_timings, 'pitch'):
+            self._extract_pitch(audio_data, spectrogram, features)
+        
+        # 2. Energy/Volume
+        with stage_timer(stage_timings, 'energy'):
+            rms = self._extract_energy(audio_data, features)
+        
+        # 3. Tempo (speaking rate)
+        if self.tempo_method == 'speaking_rate':
+            with stage_timer(stage_timings, 'speaking_rate'):
+                self._extract_speaking_rate(rms, features)
+        else:
+            with stage_timer(stage_timings, 'beat_track'):
+                self._extract_tempo(spectrogram, features)
+        
+        # 4. Spectral characteristics
+        with stage_timer(stage_timings, 'spectral_centroid'):
+            self._extract_spectral_centroid(spectrogram, features)
         
         # 5. Zero crossing rate (roughness/smoothness)
-        zcr = librosa.feature.zero_crossing_rate(audio_data)[0]
-        features['zero_crossing_rate'] = np.mean(zcr)
+        with stage_timer(stage_timings, 'zero_crossing_rate'):
+            self._extract_zero_crossing_rate(audio_data, features)
         
         # 6. MFCC (Mel-frequency cepstral coefficients) - voice timbre
-        mfccs = librosa.feature.mfcc(y=audio_data, sr=self.sample_rate, n_mfcc=13)
-        for i in range(5):  # Use first 5 MFCCs
-            features[f'mfcc_{i}'] = np.mean(mfccs[i])
+        with stage_timer(stage_timings, 'mfcc'):
+            self._extract_mfcc(spectrogram, features)
         
         return features
     
@@ -0,0 +1,114 @@
+"""
+Voice Embedding Module
+Normalized continuous voice embeddings and a spatial index over them.
+"""
+import numpy as np
+
+
+# (feature name, reference center, reference scale, weight, log scale)
+# Each dimension is (value - center) / scale * weight, so one unit means
+# "one typical spread" and pitch counts the most, as in the profile matcher.
+EMBEDDING_DIMENSIONS = (
+    ('mean_pitch', 180.0, 60.0, 2.0, False),
+    ('mean_energy', np.log10(0.02), 0.5, 1.2, True),
+    ('tempo', 100.0, 30.0, 0.9, False),
+    ('spectral_centroid', 2000.0, 800.0, 0.5, False),
+    ('zero_crossing_rate', 0.08, 0.04, 0.4, False),
+    ('mfcc_0', -300.0, 100.0, 0.4, False),
+    ('mfcc_1', 100.0, 40.0, 0.4, False),
+    ('mfcc_2', 0.0, 30.0, 0.3, False),
+    ('mfcc_3', 0.0, 30.0, 0.3, False),
+    ('mfcc_4', 0.0, 30.0, 0.3, False),
+)
+
+EMBEDDING_SIZE = len(EMBEDDING_DIMENSIONS)
+
+# Representative feature values for the categorical profile attributes
+ENERGY_LEVEL_VALUES = {'soft': 0.005, 'moderate': 0.022, 'loud': 0.08}
+TEMPO_VALUES = {'slow': 65.0, 'moderate': 100.0, 'fast': 140.0}
+
+
+def embed_features(features):
+    """
+    Build the normalized embedding of a feature dict.
+    
+    Args:
+        features: Dictionary with any of the EMBEDDING_DIMENSIONS keys;
+            missing features sit at the reference center (0 in the
+            embedding), which shifts all distances equally
+    
+    Returns:
+        1-D float64 numpy array of length EMBEDDING_SIZE
+    """
+    vector = np.zeros(EMBEDDING_SIZE)
+    for i, (name, center, scale, weight, log_scale) in enumerate(EMBEDDING_DIMENSIONS):
+        value = features.get(name)
+        if value is None:
+            continue
+        value = float(value)
+        if log_scale:
+            value = np.log10(max(value, 1e-6))
+        vector[i] = (value - center) / scale * weight
+    return vector
+
+
+def profile_features(voice_profile):
+    """
+    Feature dict describing a character's voice profile.
+    
+    Explicit measurements in voice_profile['features'] win; otherwise the
+    pitch range midpoint and the energy/tempo categories are used.
+    
+    Args:
+        voice_profile: Character 'voice_profile' dict
+    
+    Returns:
+        Dictionary of feature values
+    """
+    min_pitch, max_pitch = voice_profile['pitch_range']
+    features = {
+        'mean_pitch': (min_pitch + max_pitch) / 2,
+        'mean_energy': ENERGY_LEVEL_VALUES[voice_profile['energy_level']],
+        'tempo': TEMPO_VALUES[voice_profile['tempo']],
+    }
+    features.update(voice_profile.get('features') or {})
+    return features
+
+
+def distance_to_score(distance):
+    """Map embedding distance to a 0-100 similarity score."""
+    return 100.0 * np.exp(-np.square(distance) / 8.0)
+
+
+class VoiceIndex:
+    """KD-tree over character embeddings for sublinear top-k queries."""
+    
+    def __init__(self, embeddings):
+        """
+        Build the index.
+        
+        Args:
+            embeddings: (n_characters, EMBEDDING_SIZE) array
+        """
+        self.size = len(embeddings)
+        # Imported here: scipy.spatial is slow to import and only the
+        # embedding match mode needs it
+        from scipy.spatial import cKDTree
+        self._tree = cKDTree(embeddings) if self.size else None
+    
+    def query(self, embedding, k):
+        """
+        Find the k nearest characters.
+        
+        Args:
+            embedding: Query embedding
+            k: Number of neighbours
+        
+        Returns:
+            Tuple of (distances, indices) arrays, nearest first
+        """
+        k = min(k, self.size)
+        if k <= 0:
+            return np.array([]), np.array([], dtype=np.intp)
+        distances, indices = self._tree.query(embedding, k=k)
+        return np.atleast_1d(distances), np.atleast_1d(indices)
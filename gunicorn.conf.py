@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for Voice Character Matcher.
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden through environment variables.
+"""
+import os
+import multiprocessing
+
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+# Load the app (librosa, numpy, VoiceAnalyzer, CharacterMatcher) in the
+# master before forking so workers share its memory copy-on-write
+preload_app = True
+
+workers = int(os.getenv('WEB_CONCURRENCY', str(multiprocessing.cpu_count())))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '2'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Recycle workers periodically to bound slow memory growth (0 = never)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '0'))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_worker_init(worker):
+    """Start the worker's analysis processes before it accepts requests."""
+    from app import analysis_pool
+    analysis_pool.start()
@@ -36,7 +36,7 @@ pip install -r requirements.txt --quiet
 
 echo ""
 echo "✅ Setup complete!"
-echo "🚀 Starting Flask server..."
+echo "🚀 Starting server..."
 echo ""
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 echo "   🌐 Open your browser: http://localhost:5000"
@@ -44,6 +44,12 @@ echo "   Press Ctrl+C to stop the server"
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 echo ""
 
-# Run Flask app
-python app.py
+# Run the server
+# SERVER_MODE=production uses gunicorn with preloaded, pre-forked workers
+# (tune with WEB_CONCURRENCY, GUNICORN_THREADS, GUNICORN_TIMEOUT)
+if [ "$SERVER_MODE" = "production" ] || [ "$1" = "--production" ]; then
+    exec gunicorn -c gunicorn.conf.py wsgi:app
+else
+    python app.py
+fi
 
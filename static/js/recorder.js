@@ -4,6 +4,18 @@ let audioChunks = [];
 let audioBlob;
 let recordingTimeout;
 
+// Streaming upload state (chunks are analyzed on the server while recording)
+const STREAM_TIMESLICE_MS = 250;
+let streamSessionId = null;
+let streamQueue = Promise.resolve();
+let streamFailed = false;
+
+// Raw PCM captured alongside MediaRecorder; uploading it lets the server
+// skip container decoding entirely
+let pcmContext = null;
+let pcmChunks = [];
+let pcmSampleRate = 0;
+
 // DOM Elements
 const recordBtn = document.getElementById('recordBtn');
 const stopBtn = document.getElementById('stopBtn');
@@ -39,11 +51,14 @@ recordBtn.addEventListener('click', async () => {
         mediaRecorder = new MediaRecorder(stream, { mimeType });
         
         audioChunks = [];
+        startStreamSession();
+        startPcmCapture(stream);
         
         // Collect audio data
         mediaRecorder.ondataavailable = (event) => {
             if (event.data.size > 0) {
                 audioChunks.push(event.data);
+                sendStreamChunk(event.data);
             }
         };
         
@@ -59,11 +74,12 @@ recordBtn.addEventListener('click', async () => {
             recordingStatus.style.color = '#065f46';
             
             // Stop all tracks
+            stopPcmCapture();
             stream.getTracks().forEach(track => track.stop());
         };
         
-        // Start recording
-        mediaRecorder.start();
+        // Start recording, emitting a chunk every STREAM_TIMESLICE_MS
+        mediaRecorder.start(STREAM_TIMESLICE_MS);
         recordBtn.disabled = true;
         stopBtn.disabled = false;
         recordingStatus.textContent = '🔴 Recording... Speak now!';
@@ -110,34 +126,43 @@ analyzeBtn.addEventListener('click', async () => {
     window.scrollTo({ top: loadingSection.offsetTop - 100, behavior: 'smooth' });
     
     try {
-        // Convert blob to base64
-        const reader = new FileReader();
-        reader.readAsDataURL(audioBlob);
+        // Most of the analysis already happened while recording; fall back
+        // to a full upload if the stream was not usable
+        let data = await finishStreamSession();
         
-        reader.onloadend = async () => {
-            const base64Audio = reader.result;
-            
-            // Send to backend
-            const response = await fetch('/api/analyze', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ audio: base64Audio })
-            });
-            
-            const data = await response.json();
-            
-            loadingSection.style.display = 'none';
-            
-            if (data.success) {
-                displayResults(data);
-                resultsSection.style.display = 'block';
-                window.scrollTo({ top: resultsSection.offsetTop - 100, behavior: 'smooth' });
+        if (!data || !data.success) {
+            const pcm = encodePcm16();
+            let response;
+            if (pcm) {
+                // Raw 16-bit PCM needs no decoding on the server
+                response = await fetch('/api/analyze', {
+                    method: 'POST',
+                    headers: { 'Content-Type': `audio/pcm;format=s16le;rate=${pcmSampleRate}` },
+                    body: pcm
+                });
             } else {
-                alert('Error analyzing voice: ' + (data.error || 'Unknown error'));
+                // Send the raw recording as multipart form data (no base64 overhead)
+                const formData = new FormData();
+                formData.append('audio', audioBlob, 'recording.webm');
+                
+                response = await fetch('/api/analyze', {
+                    method: 'POST',
+                    body: formData
+                });
             }
-        };
+            
+            data = await response.json();
+        }
+        
+        loadingSection.style.display = 'none';
+        
+        if (data.success) {
+            displayResults(data);
+            resultsSection.style.display = 'block';
+            window.scrollTo({ top: resultsSection.offsetTop - 100, behavior: 'smooth' });
+        } else {
+            alert('Error analyzing voice: ' + (data.error || 'Unknown error'));
+        }
         
     } catch (error) {
         loadingSection.style.display = 'none';
@@ -146,6 +171,124 @@ analyzeBtn.addEventListener('click', async () => {
     }
 });
 
+// Raw PCM capture helpers
+function startPcmCapture(stream) {
+    pcmChunks = [];
+    const AudioContextClass = window.AudioContext || window.webkitAudioContext;
+    if (!AudioContextClass) {
+        return;
+    }
+    try {
+        pcmContext = new AudioContextClass({ sampleRate: 44100 });
+        pcmSampleRate = pcmContext.sampleRate;
+        const source = pcmContext.createMediaStreamSource(stream);
+        const processor = pcmContext.createScriptProcessor(4096, 1, 1);
+        processor.onaudioprocess = (event) => {
+            // The input buffer is reused by the browser, so keep a copy
+            pcmChunks.push(new Float32Array(event.inputBuffer.getChannelData(0)));
+        };
+        source.connect(processor);
+        processor.connect(pcmContext.destination);
+    } catch (error) {
+        console.warn('PCM capture unavailable:', error);
+        pcmContext = null;
+        pcmChunks = [];
+    }
+}
+
+function stopPcmCapture() {
+    if (pcmContext) {
+        pcmContext.close();
+        pcmContext = null;
+    }
+}
+
+function encodePcm16() {
+    const length = pcmChunks.reduce((total, chunk) => total + chunk.length, 0);
+    if (!length) {
+        return null;
+    }
+    // Int16Array uses platform byte order, DataView pins little-endian
+    const view = new DataView(new ArrayBuffer(length * 2));
+    let offset = 0;
+    for (const chunk of pcmChunks) {
+        for (let i = 0; i < chunk.length; i++, offset += 2) {
+            const sample = Math.max(-1, Math.min(1, chunk[i]));
+            view.setInt16(offset, sample < 0 ? sample * 0x8000 : sample * 0x7fff, true);
+        }
+    }
+    return view.buffer;
+}
+
+// Streaming upload helpers
+function startStreamSession() {
+    // A recording that was never analyzed still holds a decoder on the server
+    abortStreamSession();
+    streamQueue = streamQueue
+        .then(() => {
+            streamFailed = false;
+            return fetch('/api/stream', { method: 'POST' });
+        })
+        .then(response => response.ok ? response.json() : Promise.reject(response.status))
+        .then(data => { streamSessionId = data.session_id; })
+        .catch(() => { streamFailed = true; });
+}
+
+function abortStreamSession(keepalive = false) {
+    const cancel = sessionId => fetch(`/api/stream/${sessionId}`, { method: 'DELETE', keepalive })
+        .catch(() => {});
+    if (keepalive) {
+        // Page is going away: there is no time to wait for queued chunks
+        if (streamSessionId) {
+            cancel(streamSessionId);
+            streamSessionId = null;
+        }
+        return;
+    }
+    streamQueue = streamQueue.then(() => {
+        const sessionId = streamSessionId;
+        streamSessionId = null;
+        if (sessionId) {
+            return cancel(sessionId);
+        }
+    });
+}
+
+window.addEventListener('pagehide', () => abortStreamSession(true));
+
+function sendStreamChunk(chunk) {
+    // Chain requests so chunks reach the server in recording order
+    streamQueue = streamQueue.then(async () => {
+        if (streamFailed || !streamSessionId) {
+            return;
+        }
+        const response = await fetch(`/api/stream/${streamSessionId}/chunk`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/octet-stream' },
+            body: chunk
+        });
+        if (!response.ok) {
+            streamFailed = true;
+        }
+    }).catch(() => { streamFailed = true; });
+}
+
+async function finishStreamSession() {
+    await streamQueue;
+    const sessionId = streamSessionId;
+    streamSessionId = null;
+    if (streamFailed || !sessionId) {
+        return null;
+    }
+    try {
+        const response = await fetch(`/api/stream/${sessionId}/finish`, { method: 'POST' });
+        return await response.json();
+    } catch (error) {
+        console.warn('Streaming analysis failed, uploading recording instead:', error);
+        return null;
+    }
+}
+
 // Try Again
 tryAgainBtn.addEventListener('click', () => {
     resultsSection.style.display = 'none';
@@ -0,0 +1,67 @@
+"""
+Shared pytest fixtures: import paths and a local stand-in image server.
+"""
+import os
+import sys
+import threading
+import http.server
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'core'))
+
+# Keep app imports cheap and deterministic
+os.environ.setdefault('WARMUP', 'false')
+
+IMAGE_BYTES = b'\x89PNG\r\n\x1a\nstand-in image'
+
+
+class UpstreamServer:
+    """Local HTTP/1.1 image server that counts the requests it answers."""
+    
+    def __init__(self, idle_timeout=None, delay=0.0):
+        self.hits = 0
+        self.delay = delay
+        server = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Idle keep-alive connections are closed after this many seconds
+            timeout = idle_timeout
+            
+            def do_GET(self):
+                server.hits += 1
+                if server.delay:
+                    threading.Event().wait(server.delay)
+                if self.path.startswith('/missing'):
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/png')
+                self.send_header('Content-Length', str(len(IMAGE_BYTES)))
+                self.end_headers()
+                self.wfile.write(IMAGE_BYTES)
+            
+            def log_message(self, *args):
+                pass
+        
+        self._httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self._httpd.server_port}'
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+    
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def upstream():
+    server = UpstreamServer()
+    yield server
+    server.close()
@@ -0,0 +1,42 @@
+"""
+Tests for the analysis process pool.
+"""
+import os
+import signal
+
+import numpy as np
+import pytest
+
+from analysis_pool import AnalysisPool
+from voice_analyzer import VoiceAnalyzer
+
+
+@pytest.fixture
+def audio_data():
+    t = np.arange(16000) / 16000
+    return (0.3 * np.sin(2 * np.pi * 180 * t)).astype(np.float32)
+
+
+@pytest.fixture
+def pool():
+    pool = AnalysisPool(VoiceAnalyzer(), workers=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_workers_are_spawned_not_forked(pool):
+    assert pool._get_executor()._mp_context.get_start_method() == 'spawn'
+
+
+def test_pool_recovers_after_a_worker_is_killed(pool, audio_data):
+    features, _ = pool.analyze(audio_data)
+    broken = pool._executor
+    
+    for process in list(broken._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+    
+    # The next job gets a fresh pool instead of BrokenProcessPool
+    assert pool.analyze(audio_data)[0] == features
+    assert pool._executor is not broken
+    assert pool.analyze(audio_data)[0] == features
@@ -0,0 +1,29 @@
+"""
+Tests for the analysis profiles' frame settings.
+"""
+import pytest
+
+from analysis_profiles import frame_settings, get_analysis_profile
+from voice_analyzer import VoiceAnalyzer
+from warmup import synthetic_voice
+
+
+def test_frames_keep_the_reference_durations():
+    assert frame_settings(44100) == (2048, 512)
+    assert frame_settings(16000) == (750, 186)
+
+
+# Speaking-rate tempo (the default) depends on the frame timing; the beat
+# tracker is left out because it jumps between tempo octaves at any rate
+@pytest.mark.parametrize('syllable_rate', [2.0, 3.0, 4.0])
+def test_profiles_agree_on_tempo(syllable_rate):
+    results = []
+    for name in ('quality', 'fast'):
+        profile = get_analysis_profile(name)
+        analyzer = VoiceAnalyzer(sample_rate=profile['sample_rate'])
+        audio = synthetic_voice(analyzer.sample_rate, duration=6.0, syllable_rate=syllable_rate)
+        features = analyzer.extract_features(audio)
+        results.append((features['tempo'], analyzer.categorize_voice(features)['tempo_category']))
+    (quality_tempo, quality_category), (fast_tempo, fast_category) = results
+    assert fast_category == quality_category
+    assert fast_tempo == pytest.approx(quality_tempo, rel=0.02)
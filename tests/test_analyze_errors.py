@@ -0,0 +1,86 @@
+"""
+Tests that malformed /api/analyze uploads are answered as client errors.
+"""
+import io
+import shutil
+
+import numpy as np
+import pytest
+import scipy.io.wavfile
+
+
+# Half a second of f32 audio with NaN and Inf samples in it
+NON_FINITE = np.tile(np.array([0.1, np.nan, -0.2, np.inf], dtype=np.float32), 2000)
+
+
+@pytest.fixture
+def app_module():
+    import app
+    return app
+
+
+@pytest.mark.parametrize('body, content_type, message', [
+    (b'\x00' * 7, 'audio/pcm;format=f32le;rate=16000', 'whole number of f32le samples'),
+    (b'\x00' * 8, 'audio/pcm;format=u8', "Unsupported PCM format 'u8'"),
+    (b'\x00' * 8, 'audio/pcm;format=s16le;rate=0', 'sample rate must be positive'),
+    pytest.param(
+        NON_FINITE.astype('<f4').tobytes(), 'audio/pcm;format=f32le;rate=16000',
+        'samples must be finite', id='nan-pcm'
+    ),
+    (b'{"audio": "data:audio/webm;base64,abc"}', 'application/json', 'not valid base64'),
+    (b'{"audio": 42}', 'application/json', 'base64 string'),
+    (b'[]', 'application/json', 'must be a JSON object'),
+    (b'"x"', 'application/json', 'must be a JSON object'),
+])
+def test_malformed_upload_is_400(app_module, body, content_type, message):
+    response = app_module.app.test_client().post(
+        '/api/analyze', data=body, content_type=content_type
+    )
+    assert response.status_code == 400
+    assert message in response.get_json()['error']
+
+
+@pytest.mark.skipif(not shutil.which('ffmpeg'), reason='ffmpeg not installed')
+def test_non_finite_float_wav_is_400(app_module):
+    wav = io.BytesIO()
+    scipy.io.wavfile.write(wav, 16000, NON_FINITE)
+    response = app_module.app.test_client().post(
+        '/api/analyze', data=wav.getvalue(), content_type='application/octet-stream'
+    )
+    assert response.status_code == 400
+    assert 'samples must be finite' in response.get_json()['error']
+
+
+def test_silent_upload_is_400(app_module):
+    response = app_module.app.test_client().post(
+        '/api/analyze', data=b'\x00' * 32000, content_type='audio/pcm;format=s16le;rate=16000'
+    )
+    assert response.status_code == 400
+    assert 'empty or silent' in response.get_json()['error']
+
+
+def test_malformed_upload_counts_as_client_error(app_module):
+    errors = app_module.REQUEST_ERRORS
+    before = dict(errors._values)
+    app_module.app.test_client().post('/api/analyze', data=b'\x00' * 7, content_type='audio/pcm')
+    
+    def delta(kind):
+        key = ('analyze_voice', kind)
+        return errors._values.get(key, 0) - before.get(key, 0)
+    assert delta('client') == 1
+    assert delta('server') == 0
+
+
+@pytest.mark.parametrize('body, message', [
+    (b'[]', 'must be a JSON object'),
+    (b'"x"', 'must be a JSON object'),
+    (b'{"recordings": "abc"}', '"recordings" must be a list'),
+    (b'{"recordings": {"a": 1}}', '"recordings" must be a list'),
+    (b'{}', 'No audio data provided'),
+])
+def test_malformed_batch_is_400(app_module, body, message):
+    response = app_module.app.test_client().post(
+        '/api/analyze_batch', data=body, content_type='application/json'
+    )
+    assert response.status_code == 400
+    assert message in response.get_json()['error']
@@ -0,0 +1,60 @@
+"""
+Tests for the asyncio server's image route.
+"""
+import asyncio
+import socket
+
+import pytest
+
+pytest.importorskip('aiohttp')
+from aiohttp.test_utils import TestClient, TestServer
+
+from conftest import IMAGE_BYTES
+from image_proxy import ImageProxy
+
+
+def _closed_port_url():
+    """URL of a local port nothing is listening on."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f'http://127.0.0.1:{port}'
+
+
+@pytest.fixture
+def async_image_route(tmp_path, monkeypatch):
+    """Fetch /api/image/<name> from the async app, with images at `base_url`."""
+    import app
+    import async_app
+    monkeypatch.setattr(app, 'image_proxy', ImageProxy(str(tmp_path), timeout=2))
+    
+    def fetch(name, base_url):
+        monkeypatch.setattr(
+            app.matcher.db, 'get_character',
+            lambda name: {'name': name, 'image_url': f'{base_url}/{name}.png'}
+        )
+        
+        async def run():
+            client = TestClient(TestServer(await async_app.create_app()))
+            await client.start_server()
+            try:
+                response = await client.get(f'/api/image/{name}')
+                return response.status, response.content_type, await response.read()
+            finally:
+                await client.close()
+        return asyncio.run(run())
+    return fetch
+
+
+def test_unreachable_upstream_returns_json_error(async_image_route):
+    status, content_type, body = async_image_route('Poco', _closed_port_url())
+    assert status == 500
+    assert content_type == 'application/json'
+    assert body == b'{"error": "Image download failed"}'
+
+
+def test_image_is_served_from_upstream(async_image_route, upstream):
+    status, content_type, body = async_image_route('Frank', upstream.url)
+    assert status == 200
+    assert content_type == 'image/png'
+    assert body == IMAGE_BYTES
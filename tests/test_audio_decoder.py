@@ -0,0 +1,37 @@
+"""
+Tests for the incremental ffmpeg decoder stream.
+"""
+import sys
+
+import pytest
+
+from audio_decoder import DecoderStream, InvalidAudioError
+
+
+def fake_decoder(script):
+    """A stand-in for the ffmpeg command: a Python process running `script`."""
+    return [sys.executable, '-c', 'import sys\n' + script]
+
+
+def test_chatty_decoder_does_not_block():
+    # Far more error output than a pipe buffer holds, before any samples
+    blocks = []
+    stream = DecoderStream(fake_decoder(
+        "sys.stderr.write('corrupt frame\\n' * 100000); sys.stderr.flush()\n"
+        "sys.stdin.buffer.read()\n"
+        "sys.stdout.buffer.write(bytes(4 * 1000))"
+    ), blocks.append)
+    stream.write(b'chunk')
+    stream.close(timeout=10)
+    assert sum(len(block) for block in blocks) == 1000
+
+
+def test_failure_message_keeps_the_first_error():
+    stream = DecoderStream(fake_decoder(
+        "sys.stderr.write('Invalid data found\\n' + 'x' * 100000); sys.exit(1)"
+    ), lambda samples: None, stderr_limit=100)
+    with pytest.raises(InvalidAudioError) as error:
+        stream.close(timeout=10)
+    message = str(error.value)
+    assert message.startswith('Could not decode audio: Invalid data found')
+    assert len(message) < 150
@@ -0,0 +1,63 @@
+"""
+Tests for the external catalog file pair and hot reloading.
+"""
+import copy
+import os
+
+import numpy as np
+
+from catalog_store import ENERGY_CODES, write_catalog, read_catalog
+from character_database import CharacterDatabase
+from character_matcher import CharacterMatcher
+
+
+VOICE = ({'mean_pitch': 400}, {'energy_category': 'loud', 'tempo_category': 'fast'})
+
+
+def test_export_round_trip(tmp_path):
+    characters = CharacterDatabase().get_all_characters()
+    path = tmp_path / 'catalog.jsonl'
+    write_catalog(characters, str(path), '1')
+    
+    header, loaded, columns = read_catalog(str(path))
+    assert header['catalog_version'] == '1'
+    assert header['columns'] == 'catalog.1.npy'
+    assert loaded == characters
+    assert list(loaded) == list(characters)
+    profiles = [c['voice_profile'] for c in characters.values()]
+    np.testing.assert_allclose(columns['pitch_mid'], [sum(p['pitch_range']) / 2 for p in profiles])
+    assert columns['energy_code'].tolist() == [ENERGY_CODES[p['energy_level']] for p in profiles]
+
+
+def test_hot_reload_swaps_versions_and_removes_old_columns(tmp_path):
+    characters = CharacterDatabase().get_all_characters()
+    path = str(tmp_path / 'catalog.jsonl')
+    write_catalog(characters, path, '1')
+    matcher = CharacterMatcher(path)
+    before = matcher.get_top_matches(*VOICE, top_n=1)[0]['character']
+    
+    # Version 2 moves the best match far from the voice's pitch and the rest onto it
+    updated = copy.deepcopy(characters)
+    for name, character in updated.items():
+        if name != before:
+            character['voice_profile']['pitch_range'] = (390, 410)
+    updated[before]['voice_profile']['pitch_range'] = (50, 60)
+    write_catalog(updated, path, '2')
+    
+    assert sorted(os.listdir(tmp_path)) == ['catalog.2.npy', 'catalog.jsonl']
+    # The running matcher still reads its (now unlinked) mapped columns
+    assert matcher.get_top_matches(*VOICE, top_n=1)[0]['character'] == before
+    
+    db = matcher.reload()
+    assert db.version == '2'
+    assert matcher.get_top_matches(*VOICE, top_n=1)[0]['character'] != before
+    assert matcher.db.get_character(before)['voice_profile']['pitch_range'] == (50, 60)
+
+
+def test_republishing_a_version_keeps_its_columns(tmp_path):
+    characters = CharacterDatabase().get_all_characters()
+    path = str(tmp_path / 'catalog.jsonl')
+    write_catalog(characters, path, '1')
+    write_catalog(characters, path, '1')
+    assert sorted(os.listdir(tmp_path)) == ['catalog.1.npy', 'catalog.jsonl']
+    assert len(read_catalog(path)[1]) == len(characters)
@@ -0,0 +1,67 @@
+"""
+Tests for the vectorized character matcher against a plain scoring loop.
+"""
+import itertools
+
+import pytest
+
+from character_matcher import CharacterMatcher
+
+
+LEVELS = {
+    'energy': ('soft', 'moderate', 'loud'),
+    'tempo': ('slow', 'moderate', 'fast'),
+}
+
+
+def _category_similarity(user, character):
+    if user == character:
+        return 100
+    if 'moderate' in (user, character):
+        return 60
+    return 30
+
+
+def reference_matches(db, voice_features, voice_characteristics):
+    """Score every character one at a time, then stable-sort by score."""
+    matches = []
+    for name, data in db.get_all_characters().items():
+        profile = data['voice_profile']
+        low, high = profile['pitch_range']
+        pitch_sim = max(0, 100 - abs(voice_features['mean_pitch'] - (low + high) / 2) / 150 * 100)
+        energy_sim = _category_similarity(voice_characteristics['energy_category'], profile['energy_level'])
+        tempo_sim = _category_similarity(voice_characteristics['tempo_category'], profile['tempo'])
+        score = round(pitch_sim * 0.5 + energy_sim * 0.3 + tempo_sim * 0.2, 2)
+        matches.append((name, score))
+    matches.sort(key=lambda match: match[1], reverse=True)
+    return matches
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return CharacterMatcher()
+
+
+VOICES = [
+    ({'mean_pitch': pitch}, {'energy_category': energy, 'tempo_category': tempo})
+    for pitch, energy, tempo in itertools.product(
+        (60, 150, 240, 400, 900), LEVELS['energy'], LEVELS['tempo']
+    )
+]
+
+
+@pytest.mark.parametrize('voice_features, voice_characteristics', VOICES)
+def test_top_matches_follow_the_reference_loop(matcher, voice_features, voice_characteristics):
+    expected = reference_matches(matcher.db, voice_features, voice_characteristics)
+    size = len(expected)
+    for top_n in (0, 1, 5, size - 1, size, size + 3):
+        matches = matcher.get_top_matches(voice_features, voice_characteristics, top_n=top_n)
+        assert [(m['character'], m['score']) for m in matches] == expected[:top_n]
+
+
+def test_reference_cases_include_ties(matcher):
+    # Far from every pitch range, characters differ only by category, so
+    # the top-N cut lands inside a run of equal scores
+    features, characteristics = {'mean_pitch': 900}, {'energy_category': 'loud', 'tempo_category': 'fast'}
+    scores = [score for _, score in reference_matches(matcher.db, features, characteristics)]
+    assert scores[4] == scores[5]
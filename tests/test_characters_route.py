@@ -0,0 +1,39 @@
+"""
+Tests for the /api/characters query handling.
+"""
+import pytest
+
+
+@pytest.fixture
+def client():
+    import app
+    return app.app.test_client()
+
+
+def test_unknown_parameters_are_ignored(client):
+    full = client.get('/api/characters')
+    busted = client.get('/api/characters?_=123')
+    assert busted.status_code == 200
+    assert busted.data == full.data
+    assert busted.headers['ETag'] == full.headers['ETag']
+
+
+def test_filters_still_apply_next_to_unknown_parameters(client):
+    response = client.get('/api/characters?game=Brawl%20Stars&limit=2&_=123')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['limit'] == 2
+    assert len(body['characters']) == 2
+    assert all(c['game'] == 'Brawl Stars' for c in body['characters'])
+
+
+def test_invalid_pagination_is_rejected(client):
+    assert client.get('/api/characters?limit=x').status_code == 400
+    assert client.get('/api/characters?offset=-1').status_code == 400
+
+
+@pytest.mark.parametrize('param', ['limit', 'offset'])
+def test_non_integer_pagination_names_the_parameter(client, param):
+    response = client.get(f'/api/characters?{param}=abc')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': f'{param} must be an integer'}
@@ -0,0 +1,117 @@
+"""
+Tests for the feature cache's bounds and its on-disk tier.
+"""
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+import feature_cache as feature_cache_module
+from feature_cache import FeatureCache
+
+
+RESULT = ({'mean_pitch': np.float32(180.5), 'tempo': np.float64(96.0)}, {'tempo_category': 'moderate'})
+
+
+class Clock:
+    """Stand-in for time.time() that only moves when told to."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(feature_cache_module.time, 'time', clock)
+    return clock
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = FeatureCache(max_entries=2)
+    for name in ('a', 'b'):
+        cache.put(name, RESULT)
+    assert cache.get('a') is not None
+    cache.put('c', RESULT)
+    
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.snapshot()['evictions'] == 1
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = FeatureCache(ttl=10)
+    cache.put('a', RESULT)
+    clock.now += 9
+    assert cache.get('a') is not None
+    clock.now += 2
+    assert cache.get('a') is None
+    assert cache.snapshot()['expirations'] == 1
+
+
+def test_memory_stays_within_max_bytes():
+    size = len(feature_cache_module._encode(RESULT))
+    cache = FeatureCache(max_bytes=3 * size)
+    for name in 'abcde':
+        cache.put(name, RESULT)
+    
+    snapshot = cache.snapshot()
+    assert snapshot['entries'] == 3
+    assert snapshot['bytes'] <= 3 * size
+    assert [cache.get(name) is not None for name in 'abcde'] == [False, False, True, True, True]
+
+
+def test_oversized_entry_is_not_kept():
+    cache = FeatureCache(max_bytes=8)
+    cache.put('a', RESULT)
+    assert cache.get('a') is None
+
+
+def test_disabled_cache_skips_hashing():
+    cache = FeatureCache(max_entries=0)
+    assert cache.key_for(b'audio') is None
+    assert cache.get(None) is None
+    assert FeatureCache().key_for(b'audio') != FeatureCache().key_for(b'audio', 'pcm:s16le:16000')
+
+
+def test_disk_tier_shares_results_as_json(tmp_path):
+    writer = FeatureCache(disk_dir=str(tmp_path))
+    key = writer.key_for(b'audio')
+    writer.put(key, RESULT)
+    assert os.listdir(tmp_path) == [f'{key}.json']
+    
+    features, characteristics = FeatureCache(disk_dir=str(tmp_path)).get(key)
+    assert features == {'mean_pitch': 180.5, 'tempo': 96.0}
+    assert characteristics == RESULT[1]
+
+
+def test_disk_tier_never_unpickles(tmp_path):
+    cache = FeatureCache(disk_dir=str(tmp_path))
+    key = cache.key_for(b'audio')
+    # A pickle planted in the shared directory is just malformed JSON
+    (tmp_path / f'{key}.json').write_bytes(pickle.dumps(RESULT))
+    assert cache.get(key) is None
+    assert cache.snapshot()['misses'] == 1
+
+
+def test_disk_tier_is_pruned_to_its_bounds(tmp_path, clock):
+    cache = FeatureCache(disk_dir=str(tmp_path), disk_max_entries=2, disk_prune_interval=3600)
+    for age, name in enumerate('abc'):
+        cache.put(name, RESULT)
+        os.utime(tmp_path / f'{name}.json', (clock.now - 10 + age,) * 2)
+    
+    assert cache.prune_disk() == 1
+    assert sorted(os.listdir(tmp_path)) == ['b.json', 'c.json']
+
+
+def test_disk_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = FeatureCache(disk_dir=str(tmp_path), ttl=10)
+    cache.put('a', RESULT)
+    os.utime(tmp_path / 'a.json', (clock.now - 11,) * 2)
+    
+    assert FeatureCache(disk_dir=str(tmp_path), ttl=10).get('a') is None
+    assert not (tmp_path / 'a.json').exists()
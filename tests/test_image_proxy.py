@@ -0,0 +1,97 @@
+"""
+Tests for the character image proxy against a local stand-in upstream.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import IMAGE_BYTES, UpstreamServer
+from image_proxy import ImageProxy, ImageFetchError
+
+
+def test_concurrent_cold_requests_share_one_fetch(tmp_path):
+    server = UpstreamServer(delay=0.3)
+    try:
+        proxy = ImageProxy(str(tmp_path), timeout=2)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            images = list(pool.map(
+                lambda _: proxy.get('Shelly', server.url + '/shelly.png'), range(8)
+            ))
+    finally:
+        server.close()
+    
+    assert server.hits == 1
+    assert all(image.data == IMAGE_BYTES for image in images)
+    assert len({image.etag for image in images}) == 1
+
+
+def test_cached_image_is_written_atomically(tmp_path, upstream):
+    proxy = ImageProxy(str(tmp_path), timeout=2)
+    image = proxy.get('Colt', upstream.url + '/colt.png')
+    
+    assert image.mimetype == 'image/png'
+    assert (tmp_path / 'Colt.png').read_bytes() == IMAGE_BYTES
+    assert not list(tmp_path.glob('*.part'))
+    
+    # A second proxy (another worker) reads the file instead of fetching
+    assert ImageProxy(str(tmp_path)).get('Colt', upstream.url + '/colt.png').data == IMAGE_BYTES
+    assert upstream.hits == 1
+
+
+def test_failed_write_leaves_no_partial_file(tmp_path, upstream, monkeypatch):
+    proxy = ImageProxy(str(tmp_path), timeout=2)
+    
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, 'replace', failing_replace)
+    
+    with pytest.raises(ImageFetchError):
+        proxy.get('Bull', upstream.url + '/bull.png')
+    assert not list(tmp_path.iterdir())
+
+
+def test_upstream_error_is_not_cached(tmp_path, upstream):
+    proxy = ImageProxy(str(tmp_path), timeout=2)
+    with pytest.raises(ImageFetchError, match='HTTP 404'):
+        proxy.get('Nita', upstream.url + '/missing.png')
+    assert not (tmp_path / 'Nita.png').exists()
+
+
+def test_stale_pooled_connection_is_retried(tmp_path):
+    # The upstream closes idle keep-alive connections after 0.3 s
+    server = UpstreamServer(idle_timeout=0.3)
+    try:
+        proxy = ImageProxy(str(tmp_path), timeout=2)
+        assert proxy.get('Jessie', server.url + '/jessie.png').data == IMAGE_BYTES
+        time.sleep(1.0)
+        assert proxy.get('Brock', server.url + '/brock.png').data == IMAGE_BYTES
+    finally:
+        server.close()
+    assert server.hits == 2
+
+
+@pytest.fixture
+def flask_image_route(tmp_path, upstream, monkeypatch):
+    """The Flask app's image route, pointed at the stand-in upstream."""
+    import app
+    monkeypatch.setattr(app, 'image_proxy', ImageProxy(str(tmp_path), timeout=2))
+    monkeypatch.setattr(
+        app.matcher.db, 'get_character',
+        lambda name: {'name': name, 'image_url': upstream.url + f'/{name}.png'}
+    )
+    return app.app.test_client()
+
+
+def test_image_route_revalidates_with_304(flask_image_route, upstream):
+    response = flask_image_route.get('/api/image/Spike')
+    assert response.status_code == 200
+    assert response.data == IMAGE_BYTES
+    assert response.headers['Cache-Control'] == 'public, max-age=86400'
+    etag = response.headers['ETag']
+    
+    response = flask_image_route.get('/api/image/Spike', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert upstream.hits == 1
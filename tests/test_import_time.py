@@ -0,0 +1,22 @@
+"""
+Import-time budgets from benchmarks/import_time.py, checked on every run.
+"""
+import importlib.util
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_spec = importlib.util.spec_from_file_location(
+    'import_time', os.path.join(ROOT, 'benchmarks', 'import_time.py')
+)
+import_time = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(import_time)
+
+
+@pytest.mark.parametrize('name', list(import_time.IMPORT_BUDGETS))
+def test_import_stays_within_budget(name):
+    statement, budget, forbidden = import_time.IMPORT_BUDGETS[name]
+    seconds, modules = import_time.measure(statement, repeats=3)
+    assert not [module for module in forbidden if module in modules]
+    assert seconds <= budget, f"{statement!r} took {seconds:.3f} s (budget {budget} s)"
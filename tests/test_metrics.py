@@ -0,0 +1,28 @@
+"""
+Tests for the Prometheus exposition.
+"""
+import os
+
+from metrics import MetricsRegistry
+
+
+def test_process_label_is_on_every_sample():
+    registry = MetricsRegistry(process_label='pid')
+    registry.counter('requests_total', 'Requests.', ('status',)).inc(status=200)
+    registry.histogram('duration_seconds', 'Duration.', buckets=(1,)).observe(0.5)
+    
+    samples = [line for line in registry.render().splitlines() if not line.startswith('#')]
+    pid = f'pid="{os.getpid()}"'
+    assert samples == [
+        f'requests_total{{status="200",{pid}}} 1.0',
+        f'duration_seconds_bucket{{{pid},le="1.0"}} 1',
+        f'duration_seconds_bucket{{{pid},le="+Inf"}} 1',
+        f'duration_seconds_sum{{{pid}}} 0.5',
+        f'duration_seconds_count{{{pid}}} 1',
+    ]
+
+
+def test_no_process_label_by_default():
+    registry = MetricsRegistry()
+    registry.gauge('in_flight', 'In flight.').set(2)
+    assert 'in_flight 2.0' in registry.render().splitlines()
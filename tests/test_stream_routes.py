@@ -0,0 +1,34 @@
+"""
+Tests for the chunked streaming upload routes.
+"""
+import shutil
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not shutil.which('ffmpeg'), reason='ffmpeg not installed')
+
+
+@pytest.fixture
+def client():
+    import app
+    return app.app.test_client()
+
+
+def open_session(client):
+    response = client.post('/api/stream')
+    assert response.status_code == 201
+    return response.get_json()['session_id']
+
+
+def test_undecodable_stream_is_400(client):
+    session_id = open_session(client)
+    response = client.post(
+        f'/api/stream/{session_id}/chunk', data=b'not a media container' * 10,
+        content_type='application/octet-stream'
+    )
+    # A small chunk fits in the pipe to ffmpeg; the failure surfaces at finish
+    assert response.status_code == 200
+    
+    response = client.post(f'/api/stream/{session_id}/finish')
+    assert response.status_code == 400
+    assert 'Could not decode audio' in response.get_json()['error']
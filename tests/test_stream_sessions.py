@@ -0,0 +1,51 @@
+"""
+Tests for stream session expiry.
+"""
+import shutil
+import time
+
+import pytest
+
+from audio_decoder import AudioDecoder
+from stream_sessions import StreamSessionManager
+from voice_analyzer import VoiceAnalyzer
+
+pytestmark = pytest.mark.skipif(not shutil.which('ffmpeg'), reason='ffmpeg not installed')
+
+
+@pytest.fixture
+def sessions():
+    manager = StreamSessionManager(VoiceAnalyzer(), AudioDecoder(), idle_timeout=0.2)
+    yield manager
+    for session_id in list(manager._sessions):
+        manager.pop(session_id).abort()
+
+
+def test_abandoned_session_is_reaped_without_new_requests(sessions):
+    session = sessions.create()
+    process = session.stream._process
+    
+    deadline = time.monotonic() + 5
+    while process.poll() is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    
+    assert process.poll() is not None
+    assert sessions.get(session.id) is None
+    # The reaper stops once nothing is left to watch
+    time.sleep(0.3)
+    assert sessions._reaper is None
+
+
+def test_get_expires_idle_sessions(sessions):
+    session = sessions.create()
+    session.last_activity -= 1
+    assert sessions.get(session.id) is None
+    assert session.stream._process.wait(5) is not None
+
+
+def test_active_session_is_kept(sessions):
+    session = sessions.create()
+    for _ in range(4):
+        time.sleep(0.1)
+        session.last_activity = time.monotonic()
+        assert sessions.get(session.id) is session
@@ -0,0 +1,30 @@
+"""
+Tests for block-by-block feature extraction.
+"""
+import shutil
+
+import pytest
+
+from audio_decoder import AudioDecoder
+from streaming_features import extract_features_blockwise
+from voice_analyzer import VoiceAnalyzer
+from warmup import synthetic_voice, to_wav_bytes
+
+pytestmark = pytest.mark.skipif(not shutil.which('ffmpeg'), reason='ffmpeg not installed')
+
+
+@pytest.mark.parametrize('sample_rate', [44100, 16000])
+def test_blockwise_matches_whole_clip_extraction(sample_rate):
+    analyzer = VoiceAnalyzer(sample_rate=sample_rate)
+    decoder = AudioDecoder(sample_rate=sample_rate)
+    wav = to_wav_bytes(synthetic_voice(sample_rate, duration=4.0), sample_rate)
+    
+    whole = analyzer.extract_features(decoder.decode(wav)[0])
+    # 16-frame blocks split the clip into twenty or more pieces
+    blockwise = extract_features_blockwise(analyzer, decoder, wav, block_frames=16)
+    
+    # Only float rounding (variance from running sums) and the edge frames'
+    # padding differ, so every feature agrees to 0.1%
+    assert blockwise.keys() == whole.keys()
+    for name, value in whole.items():
+        assert blockwise[name] == pytest.approx(value, rel=1e-3), name
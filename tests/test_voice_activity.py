@@ -0,0 +1,45 @@
+"""
+Tests for silence trimming before feature extraction.
+"""
+import numpy as np
+import pytest
+
+from voice_activity import VoiceActivityDetector
+from voice_analyzer import VoiceAnalyzer
+
+SAMPLE_RATE = 16000
+
+
+def tone(seconds):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 200 * t)).astype(np.float32)
+
+
+def silence(seconds):
+    noise = np.random.default_rng(0).standard_normal(int(seconds * SAMPLE_RATE))
+    return (1e-4 * noise).astype(np.float32)
+
+
+def test_gap_between_tones_is_trimmed():
+    detector = VoiceActivityDetector()
+    analyzer = VoiceAnalyzer(sample_rate=SAMPLE_RATE, vad=detector)
+    reference = VoiceAnalyzer(sample_rate=SAMPLE_RATE).extract_features(tone(2.0))
+    
+    features = analyzer.extract_features(np.concatenate([tone(1.0), silence(1.0), tone(1.0)]))
+    
+    # Only the padding on either side of the gap survives, plus the frames
+    # whose window still reaches into a tone
+    assert features['duration'] == 3.0
+    kept_silence = features['speech_duration'] - 2.0
+    slack = (analyzer.n_fft + analyzer.hop_length) / SAMPLE_RATE
+    assert 0 <= kept_silence <= 2 * detector.padding + slack
+    assert features['mean_pitch'] == pytest.approx(reference['mean_pitch'], rel=0.01)
+    # Energy is diluted by the kept padding alone, not by the whole gap
+    expected_energy = reference['mean_energy'] * 2.0 / features['speech_duration']
+    assert features['mean_energy'] == pytest.approx(expected_energy, rel=0.02)
+
+
+def test_all_speech_is_left_alone():
+    audio = tone(1.0)
+    trimmed = VoiceActivityDetector().trim(audio, SAMPLE_RATE, 750, 186)
+    assert trimmed is audio